@@ -1,17 +1,20 @@
-import hashlib
+import math
 import os
 import re
 import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from queue import Empty, Full, Queue
 from datetime import datetime, timedelta
 from pathlib import Path
-from threading import Event
-from typing import Any, Dict, List, Optional, Tuple, Union
+from threading import BoundedSemaphore, Event, Lock, RLock, Timer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from bencode import bdecode, bencode
+from requests import Session
 
+from app import schemas
 from app.core.config import settings
 from app.core.event import eventmanager
 from app.db.site_oper import SiteOper
@@ -20,6 +23,18 @@ from app.helper.sites import SitesHelper
 from app.helper.torrent import TorrentHelper
 from app.log import logger
 from app.plugins import _PluginBase
+from app.plugins.crossseed.checkpoint import RunCheckpoint
+from app.plugins.crossseed.queryhistory import QueryHistory
+from app.plugins.crossseed.ratelimit import AdaptivePacer, TokenBucket
+from app.plugins.crossseed.runstats import STAGES, RunStats
+from app.plugins.crossseed.seedplan import SeedPlan
+from app.plugins.crossseed.seedstore import CacheKey, SeedStore
+from app.plugins.crossseed.siteresolver import TrackerSiteResolver
+from app.plugins.crossseed.skiprules import SkipRules
+from app.plugins.crossseed.sitesession import SiteSessions
+from app.plugins.crossseed.torrentcache import TorrentCache
+from app.plugins.crossseed.torrentindex import TorrentIndex
+from app.plugins.crossseed.torrentscan import parse_torrent_data, parse_torrent_file, parse_torrent_files
 from app.schemas import NotificationType, ServiceInfo
 from app.schemas.types import EventType
 from app.utils.http import RequestUtils
@@ -95,19 +110,16 @@ class TorInfo:
 
     @staticmethod
     def from_data(data: bytes) -> Tuple[Optional[Any], Optional[str]]:
-        try:
-            torrent = bdecode(data)
-            info = torrent["info"]
-            pieces = info["pieces"]
-            info_hash = hashlib.sha1(bencode(info)).hexdigest()
-            pieces_hash = hashlib.sha1(pieces).hexdigest()
-            local_tor = TorInfo(info_hash=info_hash, pieces_hash=pieces_hash)
-            # 从种子中获取 announce, qb可能存在获取不到的情况，会存在于fastresume文件中
-            if "announce" in torrent:
-                local_tor.torrent_announce = torrent["announce"]
-            return local_tor, None
-        except Exception as err:
-            return None, str(err)
+        hashes, err = parse_torrent_data(data)
+        if not hashes:
+            return None, err
+        return TorInfo.from_hashes(*hashes), None
+
+    @staticmethod
+    def from_hashes(info_hash: str, pieces_hash: str, announce: Optional[str] = None):
+        local_tor = TorInfo(info_hash=info_hash, pieces_hash=pieces_hash)
+        local_tor.torrent_announce = announce
+        return local_tor
 
     def get_name_id_tag(self):
         return f"{self.site_name}:{self.torrent_id}"
@@ -118,49 +130,59 @@ class TorInfo:
 
 class CrossSeedHelper(object):
     _version = "0.2.0"
+    # 站点限流提示
+    _throttle_pattern = r"频繁|过快|稍后|限制|too many|rate limit|throttl"
 
     @staticmethod
     def get_local_torrent_info(torrent_path: Path | str) -> Tuple[Optional[TorInfo], str]:
-        try:
-            if isinstance(torrent_path, Path):
-                torrent_data = torrent_path.read_bytes()
-            else:
-                with open(torrent_path, "rb") as f:
-                    torrent_data = f.read()
-            local_tor, err = TorInfo.from_data(torrent_data)
-            if not local_tor:
-                return None, err
-            local_tor.torrent_path = str(torrent_path)
-            return local_tor, ""
-        except Exception as err:
-            return None, str(err)
+        hashes, err = parse_torrent_file(torrent_path)
+        if not hashes:
+            return None, err
+        local_tor = TorInfo.from_hashes(*hashes)
+        local_tor.torrent_path = str(torrent_path)
+        return local_tor, ""
 
     @staticmethod
     def get_target_torrent(
             site: CSSiteConfig,
-            pieces_hash_set: List[str]
-    ) -> Tuple[Optional[List[TorInfo]], Optional[str]]:
+            pieces_hash_set: List[str],
+            session: Optional[Session] = None
+    ) -> Tuple[Optional[List[TorInfo]], Optional[str], bool]:
         """
         返回pieces_hash对应的种子信息，包括站点id,pieces_hash,种子id
+        :param session: 站点长连接会话，为空时每次新建连接
+        :return: (种子信息, 错误信息, 是否需要退避)，请求超时、返回429或5xx、提示请求过于频繁时需要退避，
+                 passkey错误、接口不存在等其他错误退避也无法恢复
         """
         data = {"passkey": site.passkey, "pieces_hash": pieces_hash_set}
         response = RequestUtils(cookies=site.cookie,
                                 ua=site.ua,
                                 proxies=settings.PROXY if site.proxy else None,
-                                content_type="application/json"
+                                content_type="application/json",
+                                session=session
                                 ).post(url=site.get_api_url(), json=data)
         torrents = None
         errmsg = None
+        throttled = False
         if response is None:
             errmsg = "未知错误"
+            throttled = True
         elif response.status_code != 200:
             errmsg = f"{response.status_code} Error: {response.reason}"
+            throttled = response.status_code == 429 or response.status_code >= 500
         else:
             # logger.debug(f"站点{site.name}辅种接口返回：{response.text}")
-            rsp_body = response.json()
-            if rsp_body.get("ret") != 0:
-                errmsg = "msg=" + rsp_body.get("msg")
-            elif isinstance(rsp_body["data"], dict):
+            try:
+                rsp_body = response.json()
+            except ValueError:
+                rsp_body = None
+            if not isinstance(rsp_body, dict):
+                errmsg = "辅种返回数据解析失败"
+                logger.warning(f"站点{site.name}辅种返回数据解析失败：{response.text}")
+            elif rsp_body.get("ret") != 0:
+                errmsg = f"msg={rsp_body.get('msg')}"
+                throttled = bool(re.search(CrossSeedHelper._throttle_pattern, str(rsp_body.get("msg")), re.I))
+            elif isinstance(rsp_body.get("data"), dict):
                 torrents = []
                 for pieces_hash, torrent_id in rsp_body["data"].items():
                     torrents.append(
@@ -169,7 +191,39 @@ class CrossSeedHelper(object):
             else:
                 errmsg = "辅种返回数据解析失败"
                 logger.warning(f"站点{site.name}辅种返回数据解析失败：{response.text}")
-        return torrents, errmsg
+        return torrents, errmsg, throttled
+
+    @staticmethod
+    def download_torrent(
+            site: CSSiteConfig,
+            torrent_url: str,
+            session: Optional[Session] = None
+    ) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        下载种子文件，优先使用站点长连接会话，会话请求出错（如跳转到磁力链接）时交由TorrentHelper处理
+        站点返回的内容不是种子文件时（通常是限流提示或登录页面）直接返回错误，不再重复请求
+        :return: (种子内容, 错误信息)
+        """
+        if session:
+            response = RequestUtils(cookies=site.cookie,
+                                    ua=site.ua,
+                                    proxies=settings.PROXY if site.proxy else None,
+                                    session=session
+                                    ).get_res(url=torrent_url, allow_redirects=True)
+            if response is not None:
+                if response.status_code == 200 and response.content[:1] == b"d":
+                    return response.content, None
+                if response.status_code >= 400:
+                    return None, f"下载种子出错，状态码：{response.status_code}"
+                if re.search(CrossSeedHelper._throttle_pattern, response.content.decode("utf-8", "ignore"), re.I):
+                    return None, "站点限制下载频率，请稍后重试"
+                return None, "下载的内容不是种子文件"
+        _, content, _, _, error_msg = TorrentHelper().download_torrent(
+            url=torrent_url,
+            cookie=site.cookie,
+            ua=site.ua,
+            proxy=True if site.proxy else False)
+        return content, error_msg
 
 
 class CrossSeed(_PluginBase):
@@ -180,7 +234,7 @@ class CrossSeed(_PluginBase):
     # 插件图标
     plugin_icon = "qingwa.png"
     # 插件版本
-    plugin_version = "3.0.3.1"
+    plugin_version = "3.0.28"
     # 插件作者
     plugin_author = "233@qingwa"
     # 作者主页
@@ -193,7 +247,6 @@ class CrossSeed(_PluginBase):
     auth_level = 2
 
     # 私有属性
-    key_sep = ","
     _scheduler = None
     cross_helper = None
     siteshelper: SitesHelper = None
@@ -211,18 +264,110 @@ class CrossSeed(_PluginBase):
     _nopaths = None
     _addlabels = None
     _nolabels = None
+    _parseworkers = 0
+    _querythreads = 8
+    _querycachedays = 7
+    _downloadthreads = 4
+    _addthreads = 2
+    _eventseed = False
+    _checkpointhours = 24
+    _fastscan = True
+    _dryrun = False
+    _runplan = False
     # 退出事件
     _event = Event()
-    # 待校全种子hash清单
-    _recheck_torrents = {}
-    _is_recheck_running = False
-    # 辅种缓存最大保存条数，避免长期运行时配置缓存无限增长
-    _seed_cache_max_items = 10000
+    # 待校验种子清单 {下载器: {种子hash: 添加时间}}
+    _recheck_torrents: Dict[str, Dict[str, float]] = {}
+    _recheck_lock = RLock()
+    _recheck_running_lock = Lock()
+    # 校验检查间隔（分钟），没有进展时逐步加大
+    _recheck_intervals = [1, 2, 4, 8, 15, 30]
+    _recheck_level = 0
+    _recheck_next_at = 0
+    # 超过该小时数仍未校验完成的种子不再检查
+    _recheck_max_hours = 24
+    # 每批开始做种的种子数
+    _start_batch_size = 100
+    # 辅种缓存保留天数
+    _seed_cache_days = 180
+    # 辅种失败缓存（种子不存在等）有效天数，过期后重新尝试
+    _error_cache_days = 30
+    # 辅种任务运行锁，定时辅种和下载完成辅种不同时运行
+    _seed_lock = Lock()
+    # 下载完成辅种等待合并的时间（秒），期间完成的种子合并为一批查询
+    _event_delay = 60
+    # 每批下载完成辅种的最大种子数
+    _event_batch_size = 50
+    # 等待辅种的下载完成种子 {下载器: {种子hash}}
+    _event_torrents: Dict[str, set] = {}
+    _event_lock = Lock()
+    _event_timer: Optional[Timer] = None
+    # 从qBittorrent导出种子的并发数、每批导出数，以及开始导出就连续失败多少次后停止导出
+    _export_threads = 4
+    _export_chunk_size = 20
+    _export_max_failures = 10
+    # 快速扫描时每页获取的种子数
+    _scan_page_size = 1000
+    # 快速扫描时保留的qBittorrent种子字段
+    _qb_scan_fields = ("hash", "save_path", "tags", "tracker", "state", "progress")
+    # 辅种任务断点，只在定时全量辅种时使用
+    _checkpoint: Optional[RunCheckpoint] = None
+    # tracker站点解析器
+    _site_resolver: Optional[TrackerSiteResolver] = None
+    # 下载器中所有种子hash快照，用于判断种子是否已存在
+    _torrent_hashes: Dict[str, set] = {}
+    # 本次辅种任务运行统计，保留最近的运行记录
+    _run_stats: Optional[RunStats] = None
+    _run_stats_keep = 20
+    # 预演模式下生成的辅种计划
+    _seed_plan: Optional[SeedPlan] = None
+    # 辅种结果缓存
+    _seed_store: Optional[SeedStore] = None
+    # 下载过的种子文件缓存，重试时不再从站点下载
+    _torrent_cache: Optional[TorrentCache] = None
+    _torrent_cache_mb = 200
+    _torrent_cache_days = 7
     _torrentpath_list = []
     _nopaths_list = []
     _addlabels_list = []
     _nolabels_list = []
     _site_cs_infos = []
+    # 本地种子元数据索引
+    _torrent_index: Optional[TorrentIndex] = None
+    # 站点查询记录
+    _query_history: Optional[QueryHistory] = None
+    # 本次辅种是否记录查询无结果的种子，下载完成辅种查询的是刚完成的种子，站点可能稍后才发布，不记录
+    _mark_query_history = True
+    # 站点长连接会话
+    _site_sessions: Optional[SiteSessions] = None
+    # 每批提交到进程池解析的种子文件数
+    _parse_chunk_size = 200
+    _parse_lock = Lock()
+    # 站点查询限速器及全局并发查询数限制
+    _site_limiters: Dict[str, TokenBucket] = {}
+    _site_pacers: Dict[str, AdaptivePacer] = {}
+    _limiter_lock = Lock()
+    _query_semaphore = BoundedSemaphore(_querythreads)
+    # 站点连续查询失败多少次后本次辅种任务不再查询该站点
+    _query_max_failures = 5
+    # 每个站点每秒最多下载的种子文件数
+    _site_download_rate = 2
+    _download_limiters: Dict[str, TokenBucket] = {}
+    # 正在下载的种子文件 {(站点, 种子ID): 下载结果}，多个下载器辅种同一种子时只下载一次
+    _inflight_downloads: Dict[Tuple[str, str], Future] = {}
+    _inflight_lock = Lock()
+    # 每个下载器同时添加种子的线程数限制，不同站点并发下载，添加到同一下载器时共用
+    _add_semaphores: Dict[str, BoundedSemaphore] = {}
+    # 待添加到下载器的种子队列长度
+    _add_queue_size = 20
+    # 每批添加到下载器的最大种子数，以及等待攒够一批的最长时间（秒）
+    _add_batch_size = 10
+    _add_batch_wait = 5
+    # qb异步加载添加的种子，批量添加后确认种子已出现在下载器中的最大查询次数和查询间隔（秒）
+    _add_confirm_retries = 5
+    _add_confirm_interval = 1
+    # 辅种计数锁
+    _counter_lock = Lock()
     # 辅种计数
     total = 0
     realtotal = 0
@@ -230,6 +375,7 @@ class CrossSeed(_PluginBase):
     exist = 0
     fail = 0
     cached = 0
+    cachehit = 0
 
     def init_plugin(self, config: dict = None):
         self.siteshelper = SitesHelper()
@@ -249,6 +395,16 @@ class CrossSeed(_PluginBase):
             self._nopaths = config.get("nopaths")
             self._addlabels = config.get("addlabels")
             self._nolabels = config.get("nolabels")
+            self._parseworkers = self.__to_int(config.get("parseworkers"), 0)
+            self._querythreads = max(1, self.__to_int(config.get("querythreads"), 8))
+            self._querycachedays = max(0, self.__to_int(config.get("querycachedays"), 7))
+            self._downloadthreads = max(1, self.__to_int(config.get("downloadthreads"), 4))
+            self._addthreads = max(1, self.__to_int(config.get("addthreads"), 2))
+            self._eventseed = config.get("eventseed")
+            self._checkpointhours = max(0, self.__to_int(config.get("checkpointhours"), 24))
+            self._fastscan = config.get("fastscan", True)
+            self._dryrun = config.get("dryrun")
+            self._runplan = config.get("runplan")
 
             self._torrentpath_list = self._torrentpath.strip().split("\n") if \
                 self.__is_string_not_empty(self._torrentpath) else self._torrentpath_list
@@ -316,29 +472,40 @@ class CrossSeed(_PluginBase):
 
         # 停止现有任务
         self.stop_service()
-        # 重新初始化运行期校验队列，避免类级字典跨插件重载残留。
-        self._recheck_torrents = {}
+        # 从插件数据恢复待校验种子清单，避免类级字典跨插件重载残留，重启后继续检查
+        recheck_torrents = self.get_data("recheck_torrents") or {}
+        self._recheck_torrents = {downloader: dict(torrents) for downloader, torrents in recheck_torrents.items()
+                                  if isinstance(torrents, dict) and torrents}
+        self._recheck_level = 0
+        self._recheck_next_at = 0
 
         # 启动定时任务 & 立即运行一次
-        if self.get_state() or self._onlyonce:
+        if self.get_state() or self._onlyonce or self._runplan:
             self.cross_helper = CrossSeedHelper()
             self._scheduler = BackgroundScheduler(timezone=settings.TZ)
 
-            if self._onlyonce:
-                logger.info("辅种服务启动，立即运行一次")
-                self._scheduler.add_job(self.auto_seed, 'date',
+            if self._onlyonce or self._runplan:
+                if self._runplan:
+                    logger.info("辅种服务启动，立即执行辅种计划")
+                    job_func = self.execute_plan
+                else:
+                    logger.info("辅种服务启动，立即运行一次")
+                    job_func = self.auto_seed
+                self._scheduler.add_job(job_func, 'date',
                                         run_date=datetime.now(
                                             tz=pytz.timezone(settings.TZ)) + timedelta(seconds=3)
                                         )
 
                 # 关闭一次性开关
                 self._onlyonce = False
+                self._runplan = False
                 # 保存配置
                 self.__update_config()
 
                 if self._scheduler.get_jobs():
                     # 追加种子校验服务
-                    # self._scheduler.add_job(self.check_recheck, 'interval', minutes=3)
+                    if not self.get_state():
+                        self._scheduler.add_job(self.check_recheck, 'interval', minutes=1)
                     # 启动服务
                     self._scheduler.print_jobs()
                     self._scheduler.start()
@@ -378,7 +545,44 @@ class CrossSeed(_PluginBase):
         pass
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        获取插件API
+        [{
+            "path": "/xx",
+            "endpoint": self.xxx,
+            "methods": ["GET", "POST"],
+            "summary": "API说明"
+        }]
+        """
+        return [{
+            "path": "/run_stats",
+            "endpoint": self.run_stats_api,
+            "methods": ["GET"],
+            "summary": "辅种运行统计",
+            "description": "获取最近辅种任务的各阶段耗时和站点查询统计",
+        }, {
+            "path": "/recheck_stats",
+            "endpoint": self.recheck_stats_api,
+            "methods": ["GET"],
+            "summary": "辅种做种用时统计",
+            "description": "获取辅种种子从添加到校验完成开始做种的用时统计",
+        }]
+
+    def run_stats_api(self, apikey: str) -> schemas.Response:
+        """
+        获取最近辅种任务的运行统计，可由API调用
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        return schemas.Response(success=True, data=self.get_data("run_stats") or [])
+
+    def recheck_stats_api(self, apikey: str) -> schemas.Response:
+        """
+        获取辅种种子从添加到开始做种的用时统计，可由API调用
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        return schemas.Response(success=True, data=self.get_data("recheck_stats") or {})
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
@@ -392,6 +596,16 @@ class CrossSeed(_PluginBase):
         }]
         """
         if self.get_state():
+            # 辅种种子校验检查服务，实际检查间隔由 check_recheck 根据进展调整
+            recheck_job = {
+                "id": "CrossSeedRecheck",
+                "name": "青蛙辅种助手校验检查",
+                "trigger": "interval",
+                "func": self.check_recheck,
+                "kwargs": {
+                    "minutes": 1
+                }
+            }
             # 如果开启了定时任务，并且参数齐全
             if self._cron:
                 return [{
@@ -400,7 +614,7 @@ class CrossSeed(_PluginBase):
                     "trigger": CronTrigger.from_crontab(self._cron),
                     "func": self.auto_seed,
                     "kwargs": {}
-                }]
+                }, recheck_job]
             else:
                 # 随机时间
                 triggers = TimerUtils.random_scheduler(num_executions=1,
@@ -420,7 +634,7 @@ class CrossSeed(_PluginBase):
                             "minute": trigger.minute
                         }
                     })
-                return ret_jobs
+                return ret_jobs + [recheck_job]
         elif self._enabled:
             logger.warning("青蛙辅种助手插件参数不全，定时任务未正常启动")
         return []
@@ -451,7 +665,7 @@ class CrossSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 3
+                                    'md': 2
                                 },
                                 'content': [
                                     {
@@ -467,7 +681,7 @@ class CrossSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 3
+                                    'md': 2
                                 },
                                 'content': [
                                     {
@@ -483,7 +697,7 @@ class CrossSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 3
+                                    'md': 2
                                 },
                                 'content': [
                                     {
@@ -499,7 +713,7 @@ class CrossSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 3
+                                    'md': 2
                                 },
                                 'content': [
                                     {
@@ -510,6 +724,38 @@ class CrossSeed(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 2
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'eventseed',
+                                            'label': '下载完成后辅种',
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 2
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'fastscan',
+                                            'label': '快速扫描',
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -686,6 +932,161 @@ class CrossSeed(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'parseworkers',
+                                            'label': '种子解析进程数',
+                                            'type': 'number',
+                                            'placeholder': '0为自动，1为不使用多进程'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'querythreads',
+                                            'label': '站点查询并发数',
+                                            'type': 'number',
+                                            'placeholder': '同时进行的辅种查询请求数上限'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'querycachedays',
+                                            'label': '无结果查询缓存天数',
+                                            'type': 'number',
+                                            'placeholder': '查询无结果的种子在该天数内不再重复查询，0为不缓存'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'downloadthreads',
+                                            'label': '种子下载并发数',
+                                            'type': 'number',
+                                            'placeholder': '每个站点同时下载的种子文件数'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'addthreads',
+                                            'label': '下载器添加并发数',
+                                            'type': 'number',
+                                            'placeholder': '同时向下载器添加种子的任务数'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'checkpointhours',
+                                            'label': '断点有效时间（小时）',
+                                            'type': 'number',
+                                            'placeholder': '辅种中断后在该时间内重新运行时从断点继续，0为不启用'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'dryrun',
+                                            'label': '预演模式',
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'runplan',
+                                            'label': '执行辅种计划',
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
                     {
                         'component': 'VRow',
                         'content': [
@@ -703,7 +1104,10 @@ class CrossSeed(_PluginBase):
                                             'text': '1. 定时任务周期建议每次辅种间隔时间大于1天，不填写每天上午2点到7点随机辅种一次； '
                                                     '2. 支持辅种站点列表：青蛙、AGSVPT、红豆饭、麒麟、UBits、聆音等，配置passkey时，站点名称需严格和上面选项一致，只有选中的站点会辅种，passkey可保存多个； '
                                                     '3. 请勿与IYUU辅种插件同时添加相同站点，可能会有冲突，且意义不大；'
-                                                    '4. 测试站点是否支持的方法：【站点域名/api/pieces-hash】接口访问返回405则大概率支持 '
+                                                    '4. 测试站点是否支持的方法：【站点域名/api/pieces-hash】接口访问返回405则大概率支持；'
+                                                    '5. 开启下载完成后辅种时，下载器中的种子下载完成并整理后会在1分钟内合并查询辅种，无需等待定时任务；'
+                                                    '6. 快速扫描只对qBittorrent生效，分页获取已完成种子并直接使用种子列表中的tracker，不再逐个请求种子的tracker列表；'
+                                                    '7. 开启预演模式后辅种任务只查询站点并生成辅种计划，不下载添加种子，可在详情页查看计划，确认后打开执行辅种计划按计划辅种 '
                                         }
                                     }
                                 ]
@@ -747,11 +1151,193 @@ class CrossSeed(_PluginBase):
             "torrentpath": "",
             "nopaths": "",
             "addlabels": "辅种助手",
-            "nolabels": ""
+            "nolabels": "",
+            "parseworkers": 0,
+            "querythreads": 8,
+            "querycachedays": 7,
+            "downloadthreads": 4,
+            "addthreads": 2,
+            "eventseed": False,
+            "checkpointhours": 24,
+            "fastscan": True,
+            "dryrun": False,
+            "runplan": False
         }
 
     def get_page(self) -> List[dict]:
-        pass
+        """
+        拼装插件详情页面，展示预演生成的辅种计划、最近辅种任务的运行统计、辅种做种用时和各站点当前的辅种查询参数
+        """
+        run_stats = self.get_data("run_stats") or []
+        site_pacing = self.get_data("site_pacing") or {}
+        seed_plan = self.get_data("seed_plan")
+        recheck_stats = self.get_data("recheck_stats") or {}
+        if not run_stats and not site_pacing and not seed_plan and not recheck_stats:
+            return [{
+                'component': 'VAlert',
+                'props': {
+                    'type': 'info',
+                    'variant': 'tonal',
+                    'text': '暂无辅种运行数据'
+                }
+            }]
+
+        stage_titles = {
+            'scan': '扫描',
+            'parse': '解析',
+            'query': '查询',
+            'download': '下载',
+            'add': '添加'
+        }
+        run_headers = [
+            {'key': 'started_at', 'title': '开始时间'},
+            {'key': 'kind', 'title': '类型'},
+            {'key': 'duration', 'title': '总耗时（秒）'},
+            {'key': 'throughput', 'title': '吞吐（个/秒）'}
+        ] + [{'key': stage, 'title': f'{stage_titles.get(stage, stage)}（秒）'} for stage in STAGES] + [
+            {'key': 'success', 'title': '成功'},
+            {'key': 'fail', 'title': '失败'}
+        ]
+        run_items = []
+        for run in run_stats:
+            stages = run.get("stages") or {}
+            counters = run.get("counters") or {}
+            run_items.append({
+                'started_at': datetime.fromtimestamp(run.get("started_at")).strftime("%Y-%m-%d %H:%M:%S"),
+                'kind': run.get("kind"),
+                'duration': run.get("duration"),
+                'throughput': (run.get("throughput") or {}).get("total") or "-",
+                **{stage: stages.get(stage, 0) for stage in STAGES},
+                'success': counters.get("success", 0),
+                'fail': counters.get("fail", 0)
+            })
+
+        site_headers = [
+            {'key': 'site', 'title': '站点'},
+            {'key': 'queried', 'title': '查询种子数'},
+            {'key': 'matched', 'title': '可辅种数'},
+            {'key': 'requests', 'title': '请求数'},
+            {'key': 'errors', 'title': '错误数'},
+            {'key': 'p50', 'title': 'P50延迟（秒）'},
+            {'key': 'p90', 'title': 'P90延迟（秒）'},
+            {'key': 'p99', 'title': 'P99延迟（秒）'},
+            {'key': 'batch_size', 'title': '查询批次大小'},
+            {'key': 'gap', 'title': '请求间隔（秒）'}
+        ]
+        last_sites = run_stats[0].get("sites") or {} if run_stats else {}
+        site_names = [site.name for site in self._site_cs_infos] or \
+            list(dict.fromkeys(list(last_sites.keys()) + list(site_pacing.keys())))
+        site_items = []
+        for site_name in site_names:
+            site_stats = last_sites.get(site_name) or {}
+            pacing = site_pacing.get(site_name) or {}
+            site_items.append({
+                'site': site_name,
+                **{key: site_stats.get(key) if site_stats.get(key) is not None else "-"
+                   for key in ("queried", "matched", "requests", "errors", "p50", "p90", "p99")},
+                'batch_size': pacing.get("batch_size") or 100,
+                'gap': pacing.get("gap") or "-"
+            })
+
+        page = []
+        if seed_plan:
+            plan_headers = [
+                {'key': 'downloader', 'title': '下载器'},
+                {'key': 'site', 'title': '站点'},
+                {'key': 'matched', 'title': '可辅种数'},
+                {'key': 'local', 'title': '已在本地'},
+                {'key': 'cached', 'title': '缓存跳过'},
+                {'key': 'downloads', 'title': '待下载'},
+                {'key': 'requests', 'title': '站点查询请求数'},
+                {'key': 'query_seconds', 'title': '查询预计耗时'},
+                {'key': 'download_seconds', 'title': '下载预计耗时'}
+            ]
+            plan_sites = seed_plan.get("sites") or {}
+            plan_items = []
+            for downloader, site_results in (seed_plan.get("downloaders") or {}).items():
+                for site_name, result in site_results.items():
+                    estimate = plan_sites.get(site_name) or {}
+                    plan_items.append({
+                        'downloader': downloader,
+                        'site': site_name,
+                        'matched': result.get("matched"),
+                        'local': result.get("local"),
+                        'cached': result.get("cached"),
+                        'downloads': len(result.get("tasks") or []),
+                        'requests': estimate.get("requests", "-"),
+                        'query_seconds': self.__format_seconds(estimate.get("query_seconds")),
+                        'download_seconds': self.__format_seconds(estimate.get("download_seconds"))
+                    })
+            created_at = datetime.fromtimestamp(seed_plan.get("created_at")).strftime("%Y-%m-%d %H:%M:%S")
+            plan_title = f"辅种计划（{created_at}生成，" \
+                         f"{'已执行' if seed_plan.get('executed_at') else '未执行'}，" \
+                         f"查询请求{seed_plan.get('requests')}次，待下载{seed_plan.get('downloads')}个，" \
+                         f"全量辅种预计{self.__format_seconds(seed_plan.get('full_seconds'))}，" \
+                         f"执行计划预计{self.__format_seconds(seed_plan.get('execute_seconds'))}）"
+            page.append(self.__page_table(title=plan_title, headers=plan_headers, items=plan_items))
+        page += [
+            self.__page_table(title='最近辅种任务', headers=run_headers, items=run_items),
+            self.__page_table(title='最近一次辅种站点统计', headers=site_headers, items=site_items)
+        ]
+        if recheck_stats.get("count"):
+            recheck_headers = [
+                {'key': 'count', 'title': '开始做种数'},
+                {'key': 'average', 'title': '平均用时'},
+                {'key': 'median', 'title': '最近用时中位数'},
+                {'key': 'max', 'title': '最长用时'}
+            ]
+            recent = sorted(recheck_stats.get("recent") or [])
+            recheck_items = [{
+                'count': recheck_stats.get("count"),
+                'average': self.__format_seconds(recheck_stats.get("total_seconds", 0) / recheck_stats.get("count")),
+                'median': self.__format_seconds(recent[len(recent) // 2]) if recent else "-",
+                'max': self.__format_seconds(recheck_stats.get("max_seconds"))
+            }]
+            page.append(self.__page_table(title='辅种种子从添加到开始做种的用时', headers=recheck_headers,
+                                          items=recheck_items))
+        return page
+
+    @staticmethod
+    def __page_table(title: str, headers: List[dict], items: List[dict]) -> dict:
+        """
+        详情页面中的带标题表格
+        """
+        return {
+            'component': 'VRow',
+            'content': [
+                {
+                    'component': 'VCol',
+                    'props': {
+                        'cols': 12
+                    },
+                    'content': [
+                        {
+                            'component': 'VCard',
+                            'props': {
+                                'variant': 'tonal'
+                            },
+                            'content': [
+                                {
+                                    'component': 'VCardTitle',
+                                    'text': title
+                                },
+                                {
+                                    'component': 'VDataTableVirtual',
+                                    'props': {
+                                        'headers': headers,
+                                        'items': items,
+                                        'density': 'compact',
+                                        'fixed-header': True,
+                                        'hide-no-data': True,
+                                        'hover': True
+                                    }
+                                }
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }
 
     def __update_config(self):
         self.update_config({
@@ -766,43 +1352,157 @@ class CrossSeed(_PluginBase):
             "torrentpath": self._torrentpath,
             "nopaths": self._nopaths,
             "addlabels": self._addlabels,
-            "nolabels": self._nolabels
+            "nolabels": self._nolabels,
+            "parseworkers": self._parseworkers,
+            "querythreads": self._querythreads,
+            "querycachedays": self._querycachedays,
+            "downloadthreads": self._downloadthreads,
+            "addthreads": self._addthreads,
+            "eventseed": self._eventseed,
+            "checkpointhours": self._checkpointhours,
+            "fastscan": self._fastscan,
+            "dryrun": self._dryrun,
+            "runplan": self._runplan
         })
 
-    def __trim_seed_cache(self, cache: list):
-        """
-        去重并限制辅种缓存大小，避免长期任务把配置缓存无限撑大。
-        """
-        if not cache:
-            return
-        unique_cache = []
-        seen = set()
-        for item in reversed(cache):
-            if not item or item in seen:
-                continue
-            seen.add(item)
-            unique_cache.append(item)
-        unique_cache.reverse()
-        cache[:] = unique_cache[-self._seed_cache_max_items:]
-
     def auto_seed(self):
         """
         开始辅种
         """
         logger.info("开始辅种任务 ...")
 
+        if not self.__check_seed_config():
+            return
+
+        if self._dryrun:
+            self.__dry_run()
+            return
+
+        with self._seed_lock:
+            self.__run_seed(kind="全量辅种", seed_func=self.__scan_services, resumable=True)
+        if self._event.is_set():
+            return
+
+        # 发送消息
+        self.__send_seed_message(title="【青蛙辅种助手辅种任务完成】")
+        logger.info("辅种任务执行完成")
+
+    def __check_seed_config(self) -> bool:
+        """
+        检查辅种所需的下载器、站点和种子目录配置
+        """
         if not self.service_infos:
             logger.warning("辅种结束")
-            return
+            return False
 
         if len(self._site_cs_infos) == 0:
             logger.warning("未配置辅种站点，辅种结束")
-            return
+            return False
 
         if len(self._torrentpath_list) < len(self.service_infos):
             logger.error("种子文件目录配置有误，辅种结束")
+            return False
+        return True
+
+    def __dry_run(self):
+        """
+        预演辅种，只扫描和查询站点，生成辅种计划
+        """
+        with self._seed_lock:
+            self._seed_plan = SeedPlan()
+            try:
+                self.__run_seed(kind="预演辅种", seed_func=self.__scan_services)
+                if self._event.is_set():
+                    return
+                plan = self._seed_plan.to_dict()
+            finally:
+                self._seed_plan = None
+        self.save_data("seed_plan", plan)
+        logger.info(f"辅种计划已生成，预计下载种子{plan.get('downloads')}个")
+        if self._notify:
+            self.post_message(
+                mtype=NotificationType.SiteMessage,
+                title="【青蛙辅种助手辅种计划已生成】",
+                text=f"站点查询请求数：{plan.get('requests')}\n"
+                     f"待下载种子数：{plan.get('downloads')}\n"
+                     f"全量辅种预计耗时：{self.__format_seconds(plan.get('full_seconds'))}\n"
+                     f"执行计划预计耗时：{self.__format_seconds(plan.get('execute_seconds'))}"
+            )
+
+    def execute_plan(self):
+        """
+        按预演生成的辅种计划下载并添加种子，不再重新查询站点
+        """
+        plan = self.get_data("seed_plan")
+        if not plan or not plan.get("downloaders"):
+            logger.warning("没有可执行的辅种计划")
+            return
+        if plan.get("executed_at"):
+            logger.warning("辅种计划已执行过，请重新预演生成计划")
             return
+        if not self.__check_seed_config():
+            return
+        logger.info(f"开始执行{datetime.fromtimestamp(plan.get('created_at')).strftime('%Y-%m-%d %H:%M:%S')}"
+                    f"生成的辅种计划 ...")
+        with self._seed_lock:
+            self.__run_seed(kind="执行辅种计划", seed_func=lambda: self.__execute_plan(plan))
+        if self._event.is_set():
+            return
+        plan["executed_at"] = int(time.time())
+        self.save_data("seed_plan", plan)
+        self.__send_seed_message(title="【青蛙辅种助手辅种计划执行完成】")
+        logger.info("辅种计划执行完成")
+
+    def __execute_plan(self, plan: dict):
+        """
+        按计划逐个下载器、站点下载并添加种子
+        """
+        service_infos = self.service_infos or {}
+        site_configs = {site_config.name: site_config for site_config in self._site_cs_infos}
+        for downloader, site_results in plan.get("downloaders").items():
+            service = service_infos.get(downloader)
+            if not service:
+                logger.warning(f"下载器 {downloader} 不可用，跳过辅种计划")
+                continue
+            self.__snapshot_torrent_hashes(service)
+            for site_name, result in site_results.items():
+                site_config = site_configs.get(site_name)
+                if not site_config:
+                    logger.warning(f"站点{site_name}未配置辅种，跳过辅种计划")
+                    continue
+                tasks = []
+                save_paths = {}
+                for pieces_hash, torrent_id, save_path in result.get("tasks") or []:
+                    cache_key = SeedStore.key(downloader, site_name, torrent_id)
+                    # 计划生成后可能已经辅种过
+                    if self._seed_store.get(cache_key) in (SeedStore.SUCCESS, SeedStore.ERROR):
+                        continue
+                    tasks.append((TorInfo.remote(site_name, pieces_hash, torrent_id), cache_key))
+                    save_paths[pieces_hash] = save_path
+                logger.info(f"下载器 {downloader} 站点{site_name}按计划辅种，种子数：{len(tasks)}")
+                if not self.__download_and_add(tasks=tasks, site_config=site_config,
+                                               service=service, save_paths=save_paths):
+                    logger.info("辅种服务停止")
+                    return
 
+    @staticmethod
+    def __format_seconds(seconds: Optional[float]) -> str:
+        seconds = int(seconds or 0)
+        if seconds < 60:
+            return f"{seconds}秒"
+        if seconds < 3600:
+            return f"{seconds // 60}分{seconds % 60}秒"
+        return f"{seconds // 3600}小时{seconds % 3600 // 60}分"
+
+    def __run_seed(self, kind: str, seed_func: Callable[[], None], resumable: bool = False,
+                   mark_history: bool = True):
+        """
+        执行一次辅种，调用方需持有辅种任务运行锁
+        :param kind: 辅种任务类型
+        :param seed_func: 辅种方法
+        :param resumable: 是否使用断点，中断后下次从断点继续
+        :param mark_history: 是否在站点查询记录中记录查询无结果的种子，定时辅种在有效期内跳过这些种子
+        """
         # 计数器初始化
         self.total = 0
         self.realtotal = 0
@@ -810,291 +1510,1136 @@ class CrossSeed(_PluginBase):
         self.exist = 0
         self.fail = 0
         self.cached = 0
-        # 扫描下载器辅种
-        for idx, service in enumerate(self.service_infos.values()):
-            downloader = service.name
-            downloader_obj = service.instance
-            logger.info(f"开始扫描下载器 {downloader} ...")
-            # 获取下载器中已完成的种子
-            torrents = downloader_obj.get_completed_torrents()
-            if torrents:
-                logger.info(f"下载器 {downloader} 已完成种子数：{len(torrents)}")
-            else:
-                logger.info(f"下载器 {downloader} 没有已完成种子")
-                continue
-            hash_strs = []
-            for torrent in torrents:
-                if self._event.is_set():
-                    logger.info("辅种服务停止")
-                    return
-                    # 获取种子hash
-                hash_str = self.__get_hash(torrent, service.type)
-                save_path = self.__get_save_path(torrent, service.type)
-                # 获取种子文件路径
-                torrent_path = Path(self._torrentpath_list[idx]) / f"{hash_str}.torrent"
-                torrent_info = None
-                if not torrent_path.exists():
-                    if False and service.type == "qbittorrent":
-                        # qb开启SQLite功能后将不再以hash命名的方式保存torrent文件
-                        # TODO 导出功能需要qb4.5.0以上版本才支持
-                        logger.warning(f"QB种子文件不存在：{torrent_path} 尝试远程导出种子")
-                        try:
-                            torrent_data = torrent.export()
-                            torrent_info, err = TorInfo.from_data(torrent_data)
-                        except Exception as e:
-                            err = str(e)
-                        if not torrent_info:
-                            logger.error(f"尝试远程导出种子 {hash_str} 出错 {err}")
-                            continue
-                    else:
-                        logger.error(f"种子文件不存在：{torrent_path}")
-                        continue
-
-                # 读取种子文件具体信息
-                if not torrent_info:
-                    torrent_info, err = self.cross_helper.get_local_torrent_info(torrent_path)
-                    if not torrent_info:
-                        logger.error(f"未能读取到种子文件具体信息：{torrent_path} {err}")
-                        continue
-
-                # 用站点+pieces_hash记录该站点是否已经在该下载器中,需要从tracker补充站点名字
-                tracker_urls = set()
-                try:
-                    if service.type == "qbittorrent":
-                        for i in torrent.trackers:
-                            if "https" in i.get("url"):
-                                tracker_urls.add(i.get("url"))
-                    elif service.type == "transmission":
-                        if torrent_info and torrent_info.torrent_announce:
-                            if "https" in torrent_info.torrent_announce:
-                                tracker_urls.add(torrent_info.torrent_announce)
-                except Exception as err:
-                    logger.warning(f"尝试获取 {downloader} 的tracker出错 {err}")
-                # 根据tracker补充站点信息
-                for tracker in tracker_urls:
-                    # 优先通过passkey获取站点名
-                    for site_config in self._site_cs_infos:
-                        if site_config.passkey in tracker:
-                            torrent_info.site_name = site_config.name
-                            break
-                    if not torrent_info.site_name:
-                        # 尝试通过域名获取站点信息
-                        tracker_domain = StringUtils.get_url_domain(tracker)
-                        site_info = SitesHelper().get_indexer(tracker_domain)
-                        if site_info:
-                            torrent_info.site_name = site_info.get("name")
-
-                if self._nopaths_list and save_path:
-                    # 过滤不需要转移的路径
-                    nopath_skip = False
-                    for nopath in self._nopaths_list:
-                        if os.path.normpath(save_path).startswith(os.path.normpath(nopath)):
-                            logger.info(f"种子 {hash_str} 保存路径 {save_path} 不需要辅种，跳过 ...")
-                            nopath_skip = True
-                            break
-                    if nopath_skip:
-                        continue
-
-                # 获取种子标签
-                torrent_labels = self.__get_label(torrent, service.type)
-                if torrent_labels and self._nolabels_list:
-                    is_skip = False
-                    for label in self._nolabels_list:
-                        if label in torrent_labels:
-                            logger.info(f"种子 {hash_str} 含有不辅种标签 {label}，跳过 ...")
-                            is_skip = True
-                            break
-                    if is_skip:
-                        continue
-                hash_strs.append({
-                    "hash": hash_str,
-                    "save_path": save_path,
-                    "torrent_info": torrent_info
-                })
-            if hash_strs:
-                self.__seed_torrents(hash_strs=hash_strs, service=service)
-                # 触发校验检查
-                self.check_recheck()
-            else:
-                logger.info("没有需要辅种的种子")
-
-        if self._clearcache:
+        self.cachehit = 0
+        self._run_stats = RunStats(kind=kind)
+        # 站点限速器和全局并发查询数在整个辅种任务中共享
+        self._site_limiters = {}
+        self._site_pacers = {}
+        self._download_limiters = {}
+        self._inflight_downloads = {}
+        self._add_semaphores = {}
+        self._query_semaphore = BoundedSemaphore(self._querythreads)
+        # 预演辅种不修改缓存，其他辅种任务中第一个运行的任务清除缓存
+        clear_cache = bool(self._clearcache) and not self._seed_plan
+        if clear_cache:
             # 关闭清除缓存开关
             self._clearcache = False
             # 保存配置
             self.__update_config()
+        # 打开本地种子索引和站点查询记录
+        self.__open_torrent_index()
+        self.__open_query_history(clear=clear_cache)
+        self._mark_query_history = mark_history
+        # 每个站点同时使用会话的线程：1个查询线程，以及每个下载器各自的下载线程
+        self._site_sessions = SiteSessions(pool_size=1 + self._downloadthreads * max(1, len(self._downloaders or [])))
+        self.__open_seed_store(clear=clear_cache)
+        self.__open_torrent_cache()
+        self._checkpoint = self.__load_checkpoint() if resumable else None
+        try:
+            seed_func()
+            if self._checkpoint and not self._event.is_set():
+                # 辅种任务完整结束，清除断点
+                self.del_data("checkpoint")
+        finally:
+            self._checkpoint = None
+            self.__close_seed_store()
+            self.__save_recheck_torrents()
+            self.__close_torrent_index()
+            self.__close_query_history()
+            self.__close_site_sessions()
+            self.__save_site_pacing()
+            self.__save_run_stats()
+
+    def __save_run_stats(self):
+        """
+        保存本次辅种任务运行统计，只保留最近的记录
+        """
+        if not self._run_stats:
+            return
+        run_stats = self._run_stats.to_dict(counters={
+            "total": self.total,
+            "realtotal": self.realtotal,
+            "success": self.success,
+            "exist": self.exist,
+            "fail": self.fail,
+            "cached": self.cached,
+            "cachehit": self.cachehit
+        })
+        history = self.get_data("run_stats") or []
+        self.save_data("run_stats", ([run_stats] + history)[:self._run_stats_keep])
 
-        # 发送消息
+    def __load_checkpoint(self) -> Optional[RunCheckpoint]:
+        """
+        加载上次中断的辅种任务断点，超过有效时间的断点将被丢弃
+        """
+        if not self._checkpointhours:
+            self.del_data("checkpoint")
+            return None
+        checkpoint = RunCheckpoint(data=self.get_data("checkpoint"),
+                                   max_age_hours=self._checkpointhours,
+                                   save=lambda data: self.save_data("checkpoint", data))
+        if checkpoint.resumed:
+            logger.info(f"发现{datetime.fromtimestamp(checkpoint.started_at).strftime('%Y-%m-%d %H:%M:%S')}"
+                        f"开始的辅种任务断点，将从断点继续辅种")
+        return checkpoint
+
+    def __send_seed_message(self, title: str):
+        """
+        发送辅种结果通知
+        """
         if self._notify:
             if self.success or self.fail:
                 self.post_message(
                     mtype=NotificationType.SiteMessage,
-                    title="【青蛙辅种助手辅种任务完成】",
+                    title=title,
                     text=f"服务器返回可辅种总数：{self.total}\n"
                          f"实际可辅种数：{self.realtotal}\n"
                          f"已存在：{self.exist}\n"
                          f"成功：{self.success}\n"
                          f"失败：{self.fail}\n"
-                         f"{self.cached} 条失败记录已加入缓存"
+                         f"{self.cached} 条失败记录已加入缓存\n"
+                         f"{self.cachehit} 个种子使用本地缓存，未重复下载"
                 )
-        logger.info("辅种任务执行完成")
 
-    def check_recheck(self):
+    @eventmanager.register(EventType.TransferComplete)
+    def download_completed(self, event):
+        """
+        下载完成整理后，将种子加入下载完成辅种队列，合并一段时间内完成的种子后统一辅种
+        """
+        if not self.get_state() or not self._eventseed or self._dryrun:
+            return
+        event_data = event.event_data or {}
+        downloader = event_data.get("downloader")
+        download_hash = event_data.get("download_hash")
+        if not downloader or not download_hash or downloader not in (self._downloaders or []):
+            return
+        with self._event_lock:
+            self._event_torrents.setdefault(downloader, set()).add(download_hash.lower())
+            self.__schedule_event_seed()
+        logger.debug(f"下载器 {downloader} 种子 {download_hash} 下载完成，等待辅种")
+
+    def __schedule_event_seed(self):
+        """
+        等待合并时间后执行下载完成辅种，已有等待中的任务时不重复创建，调用方需持有事件队列锁
+        """
+        if self._event_timer and self._event_timer.is_alive():
+            return
+        self._event_timer = Timer(self._event_delay, self.event_seed)
+        self._event_timer.daemon = True
+        self._event_timer.start()
+
+    def event_seed(self):
+        """
+        辅种下载完成的种子
+        """
+        if self._event.is_set():
+            return
+        if not self._seed_lock.acquire(blocking=False):
+            # 已有辅种任务在运行，稍后再试
+            with self._event_lock:
+                self._event_timer = None
+                self.__schedule_event_seed()
+            return
+        try:
+            with self._event_lock:
+                self._event_timer = None
+                torrent_hashes = {}
+                count = 0
+                for downloader in list(self._event_torrents.keys()):
+                    pending = self._event_torrents[downloader]
+                    while pending and count < self._event_batch_size:
+                        torrent_hashes.setdefault(downloader, set()).add(pending.pop())
+                        count += 1
+                    if not pending:
+                        del self._event_torrents[downloader]
+                if self._event_torrents:
+                    # 超出单批数量的种子留到下一批
+                    self.__schedule_event_seed()
+            if not torrent_hashes or not self.__check_seed_config():
+                return
+            logger.info(f"开始下载完成辅种任务，种子数：{count} ...")
+            self.__run_seed(kind="下载完成辅种", seed_func=lambda: self.__scan_services(torrent_hashes),
+                            mark_history=False)
+        finally:
+            self._seed_lock.release()
+        if self._event.is_set():
+            return
+        self.__send_seed_message(title="【青蛙辅种助手下载完成辅种】")
+        logger.info("下载完成辅种任务执行完成")
+
+    def __scan_services(self, torrent_hashes: Optional[Dict[str, set]] = None):
+        """
+        并发扫描所有下载器，汇总后统一查询站点辅种
+        :param torrent_hashes: 只辅种指定的种子 {下载器: {种子hash}}，为空时辅种下载器中所有已完成种子
+        """
+        self._torrent_hashes = {}
+        self._site_resolver = None
+        # 所有下载器的待辅种种子，汇总后每个站点只查询一次
+        seed_plans: List[Tuple[ServiceInfo, list]] = []
+        # 不辅种的路径和标签规则
+        skip_rules = SkipRules(nopaths=self._nopaths_list, nolabels=self._nolabels_list)
+        site_resolver = self.__get_site_resolver()
+        services = [(idx, service) for idx, service in enumerate(self.service_infos.values())
+                    if torrent_hashes is None or torrent_hashes.get(service.name)]
+        stopped = False
+        with ThreadPoolExecutor(max_workers=max(1, len(services)), thread_name_prefix="CrossSeedScan") as executor:
+            futures = [(service, executor.submit(self.__scan_service, idx, service, torrent_hashes,
+                                                 skip_rules, site_resolver))
+                       for idx, service in services]
+            for service, future in futures:
+                try:
+                    hash_strs = future.result()
+                except Exception as e:
+                    logger.error(f"扫描下载器 {service.name} 出错：{str(e)}")
+                    continue
+                if hash_strs is None:
+                    stopped = True
+                elif hash_strs:
+                    seed_plans.append((service, hash_strs))
+                else:
+                    logger.info(f"下载器 {service.name} 没有需要辅种的种子")
+        if stopped:
+            logger.info("辅种服务停止")
+            return
+
+        if self._torrent_index:
+            logger.info(f"种子索引统计：{self._torrent_index.stats()}")
+        if skip_rules.counts:
+            logger.info("按规则跳过的种子数：" + "，".join(f"{rule} {cnt}个" for rule, cnt in skip_rules.counts.items()))
+            self._run_stats.skips = dict(skip_rules.counts)
+        if seed_plans:
+            self.__seed_torrents(seed_plans)
+        else:
+            logger.info("没有需要辅种的种子")
+
+    def __scan_service(self, idx: int, service: ServiceInfo, torrent_hashes: Optional[Dict[str, set]],
+                       skip_rules: SkipRules, site_resolver: TrackerSiteResolver) -> Optional[list]:
+        """
+        扫描单个下载器中需要辅种的种子
+        :return: 需要辅种的种子，服务停止时返回None
+        """
+        downloader = service.name
+        downloader_obj = service.instance
+        scan_start = time.perf_counter()
+        logger.info(f"开始扫描下载器 {downloader} ...")
+        self.__snapshot_torrent_hashes(service)
+        if torrent_hashes is None:
+            # 获取下载器中已完成的种子
+            pages = self.__iter_completed_torrents(service)
+        else:
+            # 只获取指定的已完成种子
+            torrents, _ = downloader_obj.get_torrents(ids=list(torrent_hashes.get(downloader)))
+            pages = [[torrent for torrent in torrents or [] if self.__is_completed(torrent, service.type)]]
+        candidates = []
+        torrent_cnt = 0
+        for torrent in (torrent for page in pages for torrent in page):
+            torrent_cnt += 1
+            if self._event.is_set():
+                return None
+            # 获取种子hash
+            hash_str = self.__get_hash(torrent, service.type)
+            save_path = self.__get_save_path(torrent, service.type)
+
+            # 过滤不需要辅种的路径
+            nopath = skip_rules.match_path(save_path)
+            if nopath:
+                logger.debug(f"种子 {hash_str} 保存路径 {save_path} 不需要辅种，跳过 ...")
+                skip_rules.skip(f"路径 {nopath}")
+                continue
+
+            # 过滤含有不辅种标签的种子
+            nolabel = skip_rules.match_labels(self.__get_label(torrent, service.type))
+            if nolabel:
+                logger.debug(f"种子 {hash_str} 含有不辅种标签 {nolabel}，跳过 ...")
+                skip_rules.skip(f"标签 {nolabel}")
+                continue
+
+            # 获取种子文件路径
+            torrent_path = Path(self._torrentpath_list[idx]) / f"{hash_str}.torrent"
+            torrent_stat = self.__stat_file(torrent_path)
+            export = False
+            if not torrent_stat:
+                if service.type == "qbittorrent":
+                    # qb开启SQLite功能后将不再以hash命名的方式保存torrent文件，稍后从下载器导出
+                    logger.debug(f"QB种子文件不存在：{torrent_path} 尝试远程导出种子")
+                    export = True
+                else:
+                    logger.error(f"种子文件不存在：{torrent_path}")
+                    continue
+            candidates.append({
+                "hash": hash_str,
+                "save_path": save_path,
+                "torrent": torrent,
+                "torrent_path": torrent_path,
+                "torrent_stat": torrent_stat,
+                "torrent_info": None,
+                "export": export
+            })
+        self._run_stats.add_count("scan", torrent_cnt)
+        if torrent_cnt:
+            logger.info(f"下载器 {downloader} 已完成种子数：{torrent_cnt}")
+        else:
+            logger.info(f"下载器 {downloader} 没有已完成种子")
+            return []
+
+        # 读取种子文件具体信息
+        self._run_stats.add_time("scan", time.perf_counter() - scan_start)
+        self._run_stats.add_count("parse", len(candidates))
+        with self._run_stats.stage("parse"):
+            exports = [item for item in candidates if item.get("export")]
+            if exports:
+                if not self.__export_torrent_infos(service, exports):
+                    return None
+                candidates = [item for item in candidates if not item.get("export") or item.get("torrent_info")]
+            candidates = self.__load_torrent_infos(candidates)
+        if candidates is None:
+            return None
+
+        scan_start = time.perf_counter()
+        hash_strs = []
+        for item in candidates:
+            torrent = item.get("torrent")
+            torrent_info: TorInfo = item.get("torrent_info")
+            # 用站点+pieces_hash记录该站点是否已经在该下载器中,需要从tracker补充站点名字
+            tracker_urls = set()
+            try:
+                if service.type == "qbittorrent":
+                    if self._fastscan:
+                        # 使用种子列表中的当前tracker，没有可用tracker时使用种子文件中的tracker
+                        tracker = torrent.get("tracker") or torrent_info.torrent_announce
+                        if tracker and "https" in tracker:
+                            tracker_urls.add(tracker)
+                    else:
+                        for i in torrent.trackers:
+                            if "https" in i.get("url"):
+                                tracker_urls.add(i.get("url"))
+                elif service.type == "transmission":
+                    if torrent_info and torrent_info.torrent_announce:
+                        if "https" in torrent_info.torrent_announce:
+                            tracker_urls.add(torrent_info.torrent_announce)
+            except Exception as err:
+                logger.warning(f"尝试获取 {downloader} 的tracker出错 {err}")
+            # 根据tracker补充站点信息，优先通过passkey获取站点名，其次通过域名获取
+            if tracker_urls:
+                torrent_info.site_name = site_resolver.resolve(tracker_urls)
+
+            hash_strs.append({
+                "hash": item.get("hash"),
+                "save_path": item.get("save_path"),
+                "torrent_info": torrent_info
+            })
+        self._run_stats.add_time("scan", time.perf_counter() - scan_start)
+        return hash_strs
+
+    def __iter_completed_torrents(self, service: ServiceInfo) -> Iterator[list]:
+        """
+        获取下载器中已完成的种子
+        qBittorrent快速扫描时按添加时间分页获取，每页只保留辅种需要的字段，避免一次性持有所有种子对象
+        """
+        if not self._fastscan or service.type != "qbittorrent":
+            yield service.instance.get_completed_torrents() or []
+            return
+        offset = 0
+        while not self._event.is_set():
+            try:
+                page = service.instance.qbc.torrents_info(status_filter="completed", sort="added_on",
+                                                          limit=self._scan_page_size, offset=offset)
+            except Exception as e:
+                logger.error(f"获取下载器 {service.name} 已完成种子出错：{str(e)}")
+                return
+            yield [{field: torrent.get(field) for field in self._qb_scan_fields} for torrent in page]
+            if len(page) < self._scan_page_size:
+                return
+            offset += len(page)
+
+    def __get_site_resolver(self) -> TrackerSiteResolver:
+        """
+        获取本次辅种任务的tracker站点解析器
+        """
+        if not self._site_resolver:
+            self._site_resolver = TrackerSiteResolver(
+                site_passkeys={site_config.passkey: site_config.name for site_config in self._site_cs_infos},
+                indexer_lookup=self.siteshelper.get_indexer)
+        return self._site_resolver
+
+    def __snapshot_torrent_hashes(self, service: ServiceInfo):
+        """
+        一次性获取下载器中所有种子的hash，获取失败时添加前逐个查询
+        """
+        torrents, error = service.instance.get_torrents()
+        if error:
+            logger.warning(f"获取下载器 {service.name} 种子列表失败，将逐个查询种子是否存在")
+            self._torrent_hashes.pop(service.name, None)
+            return
+        torrent_hashes = set()
+        for torrent in torrents or []:
+            hash_str = self.__get_hash(torrent, service.type)
+            if hash_str:
+                torrent_hashes.add(hash_str.lower())
+        self._torrent_hashes[service.name] = torrent_hashes
+        logger.info(f"下载器 {service.name} 共有种子 {len(torrent_hashes)} 个")
+
+    def __open_seed_store(self, clear: bool = False):
+        """
+        打开辅种结果缓存，打开失败时使用内存缓存，首次运行时从旧版本插件数据迁移
+        :param clear: 是否清除已有的辅种结果
+        """
+        try:
+            self._seed_store = SeedStore(self.get_data_path() / "seed_cache.db",
+                                         retention_days=self._seed_cache_days)
+        except Exception as e:
+            logger.warning(f"打开辅种缓存失败，本次辅种结果将不会保存：{str(e)}")
+            self._seed_store = SeedStore(":memory:")
+        if clear:
+            self._seed_store.clear()
+        self.__migrate_seed_cache(discard=clear)
+
+    def __migrate_seed_cache(self, discard: bool = False):
+        """
+        迁移旧版本保存在插件数据中的辅种缓存
+        :param discard: 是否丢弃旧版本缓存，只删除插件数据
+        """
+        rows = []
+        seed_cache = self.get_data("seed_cache")
+        if isinstance(seed_cache, dict):
+            # [[下载器, 站点, 种子ID(, 过期时间)], ...]
+            for status, items in seed_cache.items():
+                rows.extend([(item[0], item[1], item[2], status, item[3] if len(item) > 3 else None)
+                             for item in items or [] if isinstance(item, list) and len(item) >= 3])
+        for downloader in self._downloaders or []:
+            # {站点: {"success": [种子ID], "error": [种子ID]}}
+            old_data = self.get_data(downloader)
+            if not isinstance(old_data, dict):
+                continue
+            for site_name, cache_data in old_data.items():
+                if not isinstance(cache_data, dict):
+                    continue
+                for status in (SeedStore.SUCCESS, SeedStore.ERROR):
+                    rows.extend([(downloader, site_name, torrent_id, status, None)
+                                 for torrent_id in cache_data.get(status) or [] if torrent_id])
+            self.del_data(downloader)
+        if seed_cache is not None:
+            self.del_data("seed_cache")
+        if rows and not discard:
+            self._seed_store.import_rows(rows)
+            logger.info(f"已迁移旧版本辅种缓存 {len(rows)} 条")
+
+    def __open_torrent_cache(self):
+        """
+        打开种子文件缓存，打开失败时每次都从站点下载
+        """
+        if self._torrent_cache:
+            return
+        try:
+            self._torrent_cache = TorrentCache(self.get_data_path() / "torrents",
+                                               max_bytes=self._torrent_cache_mb * 1024 * 1024,
+                                               ttl_days=self._torrent_cache_days)
+        except Exception as e:
+            logger.warning(f"打开种子文件缓存失败：{str(e)}")
+
+    def __close_seed_store(self):
+        if self._seed_store:
+            self._seed_store.close()
+            self._seed_store = None
+
+    def __open_torrent_index(self):
+        """
+        打开本地种子元数据索引，打开失败时退化为每次解析种子文件
+        """
+        try:
+            self._torrent_index = TorrentIndex(self.get_data_path() / "torrent_index.db")
+        except Exception as e:
+            self._torrent_index = None
+            logger.warning(f"打开种子索引失败，将直接解析种子文件：{str(e)}")
+
+    def __close_torrent_index(self):
+        if self._torrent_index:
+            self._torrent_index.close()
+            self._torrent_index = None
+
+    def __open_query_history(self, clear: bool = False):
+        """
+        打开站点查询记录，未启用或打开失败时每次都查询全部种子
+        :param clear: 是否清除各站点的查询记录
+        """
+        self._query_history = None
+        if not self._querycachedays:
+            return
+        try:
+            self._query_history = QueryHistory(self.get_data_path() / "query_history.db",
+                                               ttl_days=self._querycachedays)
+            if clear:
+                for site_config in self._site_cs_infos:
+                    self._query_history.clear(site_config.name)
+        except Exception as e:
+            self._query_history = None
+            logger.warning(f"打开站点查询记录失败，将查询全部种子：{str(e)}")
+
+    def __get_site_session(self, site_config: CSSiteConfig) -> Optional[Session]:
+        """
+        获取站点长连接会话
+        """
+        if not self._site_sessions:
+            return None
+        return self._site_sessions.get(name=site_config.name,
+                                       cookie=site_config.cookie,
+                                       ua=site_config.ua,
+                                       proxies=settings.PROXY if site_config.proxy else None)
+
+    def __close_site_sessions(self):
+        if self._site_sessions:
+            self._site_sessions.close()
+            self._site_sessions = None
+
+    def __close_query_history(self):
+        if self._query_history:
+            self._query_history.close()
+            self._query_history = None
+
+    def __load_torrent_infos(self, candidates: List[dict]) -> Optional[List[dict]]:
+        """
+        读取种子文件信息，优先从种子索引中获取，未命中的种子文件并行解析后写入索引
+        :return: 成功读取到种子信息的列表，服务停止时返回None
+        """
+        misses = []
+        for item in candidates:
+            if item.get("torrent_info"):
+                continue
+            torrent_stat: os.stat_result = item.get("torrent_stat")
+            if self._torrent_index:
+                cached = self._torrent_index.get(str(item.get("torrent_path")),
+                                                 torrent_stat.st_size, torrent_stat.st_mtime_ns)
+                if cached:
+                    item["torrent_info"] = self.__build_local_torrent_info(item.get("torrent_path"), cached)
+                    continue
+            misses.append(item)
+
+        if misses:
+            start_time = time.perf_counter()
+            results = self.__parse_torrent_files([str(item.get("torrent_path")) for item in misses])
+            if results is None:
+                return None
+            if self._torrent_index:
+                self._torrent_index.add_parse_time(time.perf_counter() - start_time)
+            for item, (hashes, err) in zip(misses, results):
+                if not hashes:
+                    logger.error(f"未能读取到种子文件具体信息：{item.get('torrent_path')} {err}")
+                    continue
+                item["torrent_info"] = self.__build_local_torrent_info(item.get("torrent_path"), hashes)
+                if self._torrent_index:
+                    torrent_stat: os.stat_result = item.get("torrent_stat")
+                    self._torrent_index.put(str(item.get("torrent_path")),
+                                            torrent_stat.st_size, torrent_stat.st_mtime_ns, *hashes)
+
+        return [item for item in candidates if item.get("torrent_info")]
+
+    def __export_torrent_infos(self, service: ServiceInfo, items: List[dict]) -> bool:
+        """
+        从qBittorrent导出没有种子文件的种子并读取种子信息，导出结果写入种子索引，每个种子只导出一次
+        导出功能需要qBittorrent 4.5.0以上版本，开始导出后连续失败时不再继续导出
+        :return: 是否完成，服务停止时返回False
+        """
+        misses = []
+        for item in items:
+            cached = self._torrent_index.get_export(service.name, item.get("hash")) if self._torrent_index else None
+            if cached:
+                item["torrent_info"] = TorInfo.from_hashes(*cached)
+            else:
+                misses.append(item)
+        if not misses:
+            return True
+        logger.info(f"下载器 {service.name} 有 {len(misses)} 个种子没有种子文件，尝试从下载器导出 ...")
+
+        def export_worker(torrent_hash: str):
+            return parse_torrent_data(service.instance.qbc.torrents_export(torrent_hash=torrent_hash))
+
+        success_cnt = 0
+        fail_cnt = 0
+        with ThreadPoolExecutor(max_workers=self._export_threads, thread_name_prefix="CrossSeedExport") as executor:
+            for i in range(0, len(misses), self._export_chunk_size):
+                if self._event.is_set():
+                    return False
+                chunk = misses[i:i + self._export_chunk_size]
+                futures = [executor.submit(export_worker, item.get("hash")) for item in chunk]
+                for item, future in zip(chunk, futures):
+                    try:
+                        hashes, err = future.result()
+                    except Exception as e:
+                        hashes, err = None, str(e)
+                    if not hashes:
+                        fail_cnt += 1
+                        logger.error(f"尝试远程导出种子 {item.get('hash')} 出错 {err}")
+                        continue
+                    success_cnt += 1
+                    item["torrent_info"] = TorInfo.from_hashes(*hashes)
+                    if self._torrent_index:
+                        self._torrent_index.put_export(service.name, item.get("hash"), *hashes)
+                if not success_cnt and fail_cnt >= self._export_max_failures:
+                    logger.warning(f"下载器 {service.name} 导出种子连续失败，可能不支持导出功能（需要qBittorrent 4.5.0以上版本），"
+                                   f"停止导出")
+                    break
+        logger.info(f"下载器 {service.name} 导出种子成功 {success_cnt} 个，失败 {fail_cnt} 个")
+        return True
+
+    @staticmethod
+    def __build_local_torrent_info(torrent_path: Path, hashes: Tuple[str, str, Optional[str]]) -> TorInfo:
+        torrent_info = TorInfo.from_hashes(*hashes)
+        torrent_info.torrent_path = str(torrent_path)
+        return torrent_info
+
+    def __parse_torrent_files(self, torrent_paths: List[str]) -> Optional[List[tuple]]:
+        """
+        解析种子文件，数量较多时按批次提交到进程池并行解析，结果顺序与输入一致
+        :return: 解析结果列表，服务停止时返回None
+        """
+        workers = self.__get_parse_workers(len(torrent_paths))
+        if workers > 1:
+            logger.info(f"使用 {workers} 个进程解析 {len(torrent_paths)} 个种子文件 ...")
+            try:
+                results = []
+                # 多个下载器并发扫描时依次使用进程池，避免进程数超过CPU核数
+                with self._parse_lock, ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(parse_torrent_files,
+                                               torrent_paths[i:i + self._parse_chunk_size])
+                               for i in range(0, len(torrent_paths), self._parse_chunk_size)]
+                    for future in futures:
+                        if self._event.is_set():
+                            for f in futures:
+                                f.cancel()
+                            return None
+                        results.extend(future.result())
+                return results
+            except Exception as e:
+                logger.warning(f"多进程解析种子文件失败，改为逐个解析：{str(e)}")
+
+        results = []
+        for torrent_path in torrent_paths:
+            if self._event.is_set():
+                return None
+            results.append(parse_torrent_file(torrent_path))
+        return results
+
+    def __get_parse_workers(self, count: int) -> int:
+        """
+        计算解析种子文件的进程数，数量较少时不值得启动进程池
+        """
+        if count < self._parse_chunk_size:
+            return 1
+        workers = self._parseworkers or min(os.cpu_count() or 1, 8)
+        return max(1, min(workers, (count + self._parse_chunk_size - 1) // self._parse_chunk_size))
+
+    def check_recheck(self, force: bool = False):
         """
         定时检查下载器中种子是否校验完成，校验完成且完整的自动开始辅种
+        没有新的校验完成种子时逐步加大检查间隔，有新种子加入时恢复
+        :param force: 是否忽略检查间隔立即检查
         """
         if not self._recheck_torrents:
             return
-        if self._is_recheck_running:
+        if not force and time.time() < self._recheck_next_at:
             return
-        self._is_recheck_running = True
-        if not self.service_infos:
+        if not self._recheck_running_lock.acquire(blocking=False):
             return
-        for service in self.service_infos.values():
-            # 需要检查的种子
-            self.check_recheck_service(service)
-        self._is_recheck_running = False
+        try:
+            service_infos = self.service_infos
+            if not service_infos:
+                return
+            progressed = False
+            for service in service_infos.values():
+                # 需要检查的种子
+                if self.check_recheck_service(service):
+                    progressed = True
+            # 有进展时保持最短间隔，否则逐步加大间隔
+            with self._recheck_lock:
+                if progressed:
+                    self._recheck_level = 0
+                else:
+                    self._recheck_level = min(self._recheck_level + 1, len(self._recheck_intervals) - 1)
+                self._recheck_next_at = time.time() + self._recheck_intervals[self._recheck_level] * 60
+                self.__save_recheck_torrents()
+        finally:
+            self._recheck_running_lock.release()
 
-    def check_recheck_service(self, service: ServiceInfo):
+    def check_recheck_service(self, service: ServiceInfo) -> bool:
         """
         检查指定下载器中种子是否校验完成，校验完成且完整的自动开始辅种
+        :return: 待检查列表是否有变化
         """
         # 需要检查的种子
         downloader = service.name
         downloader_obj = service.instance
-        recheck_torrents = self._recheck_torrents.get(downloader) or []
+        with self._recheck_lock:
+            recheck_torrents = dict(self._recheck_torrents.get(downloader) or {})
         if not recheck_torrents:
-            return
-        logger.info(f"开始检查下载器 {downloader} 的校验任务 ...")
-        # 获取下载器中的种子状态
-        torrents, _ = downloader_obj.get_torrents(ids=recheck_torrents)
-        if torrents:
-            can_seeding_torrents = []
-            for torrent in torrents:
-                # 获取种子hash
-                hash_str = self.__get_hash(torrent=torrent, dl_type=service.type)
-                if self.__can_seeding(torrent=torrent, dl_type=service.type):
-                    can_seeding_torrents.append(hash_str)
-            if can_seeding_torrents:
-                logger.info(f"共 {len(can_seeding_torrents)} 个任务校验完成，开始辅种 ...")
-                # 开始任务
-                downloader_obj.start_torrents(ids=can_seeding_torrents)
-                # 去除已经处理过的种子
-                self._recheck_torrents[downloader] = list(
-                    set(recheck_torrents).difference(set(can_seeding_torrents)))
-        elif torrents is None:
+            return False
+        logger.info(f"开始检查下载器 {downloader} 的 {len(recheck_torrents)} 个校验任务 ...")
+        # 一次获取所有待检查种子的状态
+        torrents, error = downloader_obj.get_torrents(ids=list(recheck_torrents.keys()))
+        if error:
             logger.info(f"下载器 {downloader} 查询校验任务失败，将在下次继续查询 ...")
-            return
-        else:
-            logger.info(f"下载器 {downloader} 中没有需要检查的校验任务，清空待处理列表 ...")
-            self._recheck_torrents[downloader] = []
+            return False
+        now = time.time()
+        found_torrents = set()
+        can_seeding_torrents = []
+        for torrent in torrents or []:
+            # 获取种子hash
+            hash_str = self.__get_hash(torrent=torrent, dl_type=service.type).lower()
+            found_torrents.add(hash_str)
+            if self.__can_seeding(torrent=torrent, dl_type=service.type):
+                can_seeding_torrents.append(hash_str)
+        # 下载器中已删除或长时间未校验完成的种子不再检查
+        removed_torrents = [hash_str for hash_str, added_at in recheck_torrents.items()
+                            if hash_str not in found_torrents
+                            or (hash_str not in can_seeding_torrents
+                                and now - added_at > self._recheck_max_hours * 3600)]
+        if removed_torrents:
+            logger.info(f"下载器 {downloader} 中 {len(removed_torrents)} 个校验任务已删除或超时未完成，不再检查")
+
+        if can_seeding_torrents:
+            seeding_times = [now - recheck_torrents[hash_str] for hash_str in can_seeding_torrents]
+            logger.info(f"共 {len(can_seeding_torrents)} 个任务校验完成，开始辅种，"
+                        f"平均用时 {sum(seeding_times) / len(seeding_times) / 60:.1f} 分钟 ...")
+            # 分批开始任务
+            for i in range(0, len(can_seeding_torrents), self._start_batch_size):
+                downloader_obj.start_torrents(ids=can_seeding_torrents[i:i + self._start_batch_size])
+            self.__record_seeding_times(seeding_times)
+
+        # 去除已经处理过的种子
+        with self._recheck_lock:
+            pending = self._recheck_torrents.get(downloader) or {}
+            for hash_str in can_seeding_torrents + removed_torrents:
+                pending.pop(hash_str, None)
+            if not pending:
+                self._recheck_torrents.pop(downloader, None)
+        return bool(can_seeding_torrents or removed_torrents)
+
+    def __record_seeding_times(self, seeding_times: List[float]):
+        """
+        记录辅种种子从添加到开始做种的用时
+        """
+        stats = self.get_data("recheck_stats") or {}
+        count = (stats.get("count") or 0) + len(seeding_times)
+        total_seconds = (stats.get("total_seconds") or 0) + sum(seeding_times)
+        recent = ((stats.get("recent") or []) + [round(t) for t in seeding_times])[-50:]
+        self.save_data("recheck_stats", {
+            "count": count,
+            "total_seconds": round(total_seconds),
+            "max_seconds": round(max([stats.get("max_seconds") or 0] + seeding_times)),
+            "recent": recent
+        })
 
-    def __seed_torrents(self, hash_strs: list, service: ServiceInfo):
+    def __save_recheck_torrents(self):
         """
-        执行所有种子的辅种
+        保存待校验种子清单，重启后继续检查
         """
-        if not hash_strs:
+        with self._recheck_lock:
+            self.save_data("recheck_torrents", self._recheck_torrents)
+
+    def __seed_torrents(self, seed_plans: List[Tuple[ServiceInfo, list]]):
+        """
+        执行所有下载器种子的辅种
+        所有下载器的 pieces_hash 去重后每个站点只查询一次，查询结果再按下载器分发，使用各自的保存目录
+        """
+        if not seed_plans:
             return
-        logger.info(f"下载器 {service.name} 开始查询辅种，种子总数量：{len(hash_strs)} ...")
 
-        # 每个Hash的保存目录
-        save_paths = {}
+        # 每个下载器中每个Hash的保存目录，以及已在下载器中的站点种子
+        service_save_paths: Dict[str, Dict[str, str]] = {}
+        service_site_pieces: Dict[str, set] = {}
         pieces_hash_set = set()
-        site_pieces_hash_set = set()
-        for item in hash_strs:
-            tor_info: TorInfo = item.get("torrent_info")
-            save_paths[tor_info.pieces_hash] = item.get("save_path")
-            pieces_hash_set.add(tor_info.pieces_hash)
-            if tor_info.site_name:
-                site_pieces_hash_set.add(tor_info.get_name_pieces_tag())
-
-        logger.info(f"去重后，总共需要辅种查询的种子数：{len(pieces_hash_set)}")
-        pieces_hashes = list(pieces_hash_set)
-
-        # 分站点逐个批次辅种
-        # 逐个站点查询可辅种数据
-        chunk_size = 100
-        sleep_time = 30
+        total_cnt = 0
+        for service, hash_strs in seed_plans:
+            save_paths = service_save_paths.setdefault(service.name, {})
+            site_pieces_hash_set = service_site_pieces.setdefault(service.name, set())
+            for item in hash_strs:
+                tor_info: TorInfo = item.get("torrent_info")
+                save_paths[tor_info.pieces_hash] = item.get("save_path")
+                pieces_hash_set.add(tor_info.pieces_hash)
+                if tor_info.site_name:
+                    site_pieces_hash_set.add(tor_info.get_name_pieces_tag())
+            total_cnt += len(hash_strs)
+            logger.info(f"下载器 {service.name} 需要辅种的种子数量：{len(hash_strs)}")
+
+        logger.info(f"开始查询辅种，{len(seed_plans)}个下载器种子总数量：{total_cnt}，"
+                    f"去重后总共需要辅种查询的种子数：{len(pieces_hash_set)}")
+        # 按顺序查询，断点只需记录最后一个已查询的 pieces_hash
+        pieces_hashes = sorted(pieces_hash_set)
+
+        # 检查站点是否已经停用
+        site_configs = []
         for site_config in self._site_cs_infos:
-            # 检查站点是否已经停用
             db_site = self.siteoper.get(site_config.id)
             if db_site and not db_site.is_active:
                 logger.info(f"站点{site_config.name}已停用，跳过辅种")
                 continue
-            logger.info(f"正在查询站点{site_config.name}种子，请稍候...")
-            remote_tors: List[TorInfo] = []
-            cnt = 0
-            for i in range(0, len(pieces_hashes), chunk_size):
-                if self._event.is_set():
-                    logger.info("辅种服务停止")
-                    return
-                # 切片操作
-                chunk = pieces_hashes[i:i + chunk_size]
-                # 处理分组
-                chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk)
-                if chunk_tors is None:
-                    logger.warning(f"站点{site_config.name}辅种进度{i + 1}-{i + len(chunk)}，查询失败：{err_msg}")
-                else:
-                    logger.info(f"站点{site_config.name}辅种进度{i + 1}-{i + len(chunk)}，可辅种数{len(chunk_tors)}个")
-                    remote_tors = remote_tors + chunk_tors
-                cnt += 1
-                if cnt % 5 == 0:
-                    logger.debug(f"休眠{sleep_time}秒...")
-                    time.sleep(sleep_time)
-                else:
-                    logger.debug(f"休眠{site_config.query_gap}秒...")
-                    time.sleep(site_config.query_gap)
-
-            logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{len(remote_tors)}")
-
-            # 去除已经下载过的种子
-            local_cnt = 0
-            not_local_tors = []
-            for tor_info in remote_tors:
-                if (
-                        tor_info
-                        and tor_info.site_name
-                        and tor_info.pieces_hash
-                        and tor_info.get_name_pieces_tag() in site_pieces_hash_set
-                ):
-                    local_cnt = local_cnt + 1
+            site_configs.append(site_config)
+        if not site_configs:
+            return
+
+        # 每个下载器的每个站点一个辅种线程，各站点按各自的限速并发下载，添加到同一下载器的并发数受添加线程数限制
+        seed_executor = ThreadPoolExecutor(max_workers=len(seed_plans) * len(site_configs),
+                                           thread_name_prefix="CrossSeedSeed")
+        seed_futures = []
+        try:
+            # 各站点并发查询，所有下载器共用站点限速器，先查询完成的站点先开始辅种
+            with ThreadPoolExecutor(max_workers=len(site_configs), thread_name_prefix="CrossSeedQuery") as executor:
+                futures = {executor.submit(self.__query_site, site_config, pieces_hashes): site_config
+                           for site_config in site_configs}
+                for future in as_completed(futures):
+                    site_config = futures[future]
+                    try:
+                        remote_tors, completed = future.result()
+                    except Exception as e:
+                        logger.error(f"站点{site_config.name}辅种查询出错：{str(e)}")
+                        continue
+                    if remote_tors is None or self._event.is_set():
+                        logger.info("辅种服务停止")
+                        return
+                    # 查询结果分发到含有对应种子的下载器
+                    site_futures = []
+                    for service, _ in seed_plans:
+                        save_paths = service_save_paths[service.name]
+                        service_tors = [tor for tor in remote_tors if tor and tor.pieces_hash in save_paths]
+                        if not service_tors:
+                            continue
+                        site_futures.append(seed_executor.submit(
+                            self.__seed_site_torrents, remote_tors=service_tors, site_config=site_config,
+                            service=service, save_paths=save_paths,
+                            site_pieces_hash_set=service_site_pieces[service.name]))
+                    if completed:
+                        self.__finish_site_when_done(site_config, site_futures)
+                    seed_futures.extend(site_futures)
+
+            for future in seed_futures:
+                try:
+                    if not future.result():
+                        logger.info("辅种服务停止")
+                        return
+                except Exception as e:
+                    logger.error(f"辅种出错：{str(e)}")
+        finally:
+            seed_executor.shutdown(wait=True)
+
+        logger.info("所有下载器辅种完成")
+
+    def __finish_site_when_done(self, site_config: CSSiteConfig, futures: list):
+        """
+        所有下载器都完成站点的辅种后在断点中记录站点已完成
+        """
+        checkpoint = self._checkpoint
+        if not checkpoint:
+            return
+        if not futures:
+            checkpoint.finish(site_config.name)
+            return
+        remaining = [len(futures)]
+        lock = Lock()
+
+        def on_done(future):
+            if future.cancelled() or future.exception() or not future.result():
+                return
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    checkpoint.finish(site_config.name)
+
+        for future in futures:
+            future.add_done_callback(on_done)
+
+    def __query_site(self, site_config: CSSiteConfig,
+                     pieces_hashes: List[str]) -> Tuple[Optional[List[TorInfo]], bool]:
+        """
+        分批查询单个站点可辅种数据，每个站点使用独立的限速器，同时受全局并发数限制
+        批次大小和请求间隔由站点的自适应控制器根据响应情况调整，连续失败多次后放弃查询该站点
+        :return: (站点返回的可辅种种子, 是否查询完成)，服务停止时种子为None
+        """
+        remote_tors: List[TorInfo] = []
+        checkpoint = self._checkpoint
+        if checkpoint:
+            if checkpoint.is_done(site_config.name):
+                logger.info(f"站点{site_config.name}在上次中断的辅种任务中已完成，跳过")
+                return remote_tors, True
+            cursor = checkpoint.cursor(site_config.name)
+            if cursor:
+                # 从断点继续查询，恢复断点前已查询到的可辅种结果
+                pieces_hashes = [pieces_hash for pieces_hash in pieces_hashes if pieces_hash > cursor]
+                remote_tors = [TorInfo.remote(site_config.name, pieces_hash, torrent_id)
+                               for pieces_hash, torrent_id in checkpoint.matches(site_config.name)]
+                logger.info(f"站点{site_config.name}从断点继续查询，恢复可辅种数{len(remote_tors)}个")
+        if self._query_history:
+            # 跳过有效期内已查询过且没有结果的种子
+            total_cnt = len(pieces_hashes)
+            pieces_hashes = self._query_history.filter_pending(site_config.name, pieces_hashes)
+            logger.info(f"站点{site_config.name}跳过近期已查询无结果的种子{total_cnt - len(pieces_hashes)}个，"
+                        f"本次需要查询{len(pieces_hashes)}个")
+        logger.info(f"正在查询站点{site_config.name}种子，请稍候...")
+        limiter, pacer = self.__get_site_limiter(site_config)
+        i = 0
+        retries = 0
+        failures = 0
+        completed = True
+        latencies = []
+        while i < len(pieces_hashes):
+            if self._event.is_set() or not limiter.acquire():
+                return None, False
+            # 切片操作
+            chunk = pieces_hashes[i:i + pacer.batch_size]
+            # 处理分组
+            start_time = time.monotonic()
+            with self._query_semaphore:
+                chunk_tors, err_msg, throttled = self.cross_helper.get_target_torrent(
+                    site_config, chunk, session=self.__get_site_session(site_config))
+            elapsed = time.monotonic() - start_time
+            latencies.append(elapsed)
+            self._run_stats.add_time("query", elapsed)
+            self._run_stats.add_query(site_config.name, len(chunk), elapsed,
+                                      matched=None if throttled or chunk_tors is None else len(chunk_tors))
+            if chunk_tors is None:
+                failures += 1
+                if throttled:
+                    # 只有超时和限流时退避
+                    pacer.on_failure()
+                    limiter.rate = pacer.rate
+                    logger.warning(f"站点{site_config.name}辅种进度{i + 1}-{i + len(chunk)}，查询失败：{err_msg}，"
+                                   f"批次调整为{pacer.batch_size}，请求间隔调整为{pacer.gap:.1f}秒")
                 else:
-                    not_local_tors.append(tor_info)
-            logger.info(f"站点{site_config.name}正在做种或已经辅种过的种子数为{local_cnt}")
+                    logger.warning(f"站点{site_config.name}辅种进度{i + 1}-{i + len(chunk)}，查询失败：{err_msg}")
+                if failures >= self._query_max_failures:
+                    logger.error(f"站点{site_config.name}连续{failures}次查询失败，本次辅种不再查询该站点，"
+                                 f"请检查站点passkey和站点状态")
+                    completed = False
+                    break
+                # 被限流的批次最多重试3次
+                if throttled and retries < 3:
+                    retries += 1
+                    continue
+                # 跳过查询失败的批次，断点停在该批次之前，站点不记为完成，下次运行从该批次重新查询
+                completed = False
+            else:
+                failures = 0
+                pacer.on_success(elapsed)
+                limiter.rate = pacer.rate
+                logger.info(f"站点{site_config.name}辅种进度{i + 1}-{i + len(chunk)}，可辅种数{len(chunk_tors)}个")
+                remote_tors.extend(chunk_tors)
+                chunk_matches = [(tor.pieces_hash, tor.torrent_id) for tor in chunk_tors]
+                if self._query_history and self._mark_query_history:
+                    # 记录没有可辅种结果的种子，有结果的种子每次都重新查询以便重试失败的辅种
+                    matched = {tor.pieces_hash for tor in chunk_tors}
+                    self._query_history.mark(site_config.name,
+                                             [pieces_hash for pieces_hash in chunk if pieces_hash not in matched])
+                if checkpoint and completed:
+                    checkpoint.update(site_config.name, chunk[-1], chunk_matches)
+            retries = 0
+            i += len(chunk)
+
+        if self._site_sessions:
+            self._site_sessions.log_stats(site_config.name)
+        if self._seed_plan:
+            # 按当前批次大小、请求间隔和平均响应时间估算全量查询的请求数和耗时
+            requests_cnt = math.ceil(len(pieces_hashes) / pacer.batch_size)
+            latency = sum(latencies) / len(latencies) if latencies else 0
+            self._seed_plan.set_site_estimate(site=site_config.name, requests=requests_cnt,
+                                              query_seconds=requests_cnt * max(pacer.gap, latency),
+                                              download_rate=self._site_download_rate)
+        logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{len(remote_tors)}，"
+                    f"当前批次{pacer.batch_size}，请求间隔{pacer.gap:.1f}秒")
+        return remote_tors, completed
+
+    def __get_site_limiter(self, site_config: CSSiteConfig) -> Tuple[TokenBucket, AdaptivePacer]:
+        """
+        获取站点的限速器和自适应控制器，同一次辅种任务中所有下载器共用，控制器参数从上次运行中恢复
+        """
+        with self._limiter_lock:
+            pacer = self._site_pacers.get(site_config.name)
+            if not pacer:
+                pacer = AdaptivePacer.from_dict(base_gap=site_config.query_gap,
+                                                data=(self.get_data("site_pacing") or {}).get(site_config.name))
+                self._site_pacers[site_config.name] = pacer
+            limiter = self._site_limiters.get(site_config.name)
+            if not limiter:
+                limiter = TokenBucket(rate=pacer.rate, event=self._event)
+                self._site_limiters[site_config.name] = limiter
+            return limiter, pacer
+
+    def __save_site_pacing(self):
+        """
+        保存各站点学习到的批次大小和请求间隔，供下次运行使用
+        最后仍在连续失败的站点不保存，避免下次运行从失败时退避的间隔开始
+        """
+        if not self._site_pacers:
+            return
+        site_pacing = self.get_data("site_pacing") or {}
+        for site_name, pacer in self._site_pacers.items():
+            if pacer.failures:
+                continue
+            site_pacing[site_name] = pacer.to_dict()
+        self.save_data("site_pacing", site_pacing)
 
-            cache_data = self.get_plugin_data(f"{service.name}{self.key_sep}{site_config.name}", {})
-            success_cache = [] if self._clearcache else cache_data.get("success") or []
-            fail_cache = []
-            error_cache = [] if self._clearcache else cache_data.get("error") or []
+    def __seed_site_torrents(self, remote_tors: List[TorInfo], site_config: CSSiteConfig,
+                             service: ServiceInfo, save_paths: Dict[str, str],
+                             site_pieces_hash_set: set) -> bool:
+        """
+        下载并添加单个站点返回的可辅种种子
+        :return: 是否完成，服务停止时返回False
+        """
+        # 去除已经下载过的种子
+        local_cnt = 0
+        not_local_tors = []
+        for tor_info in remote_tors:
+            if (
+                    tor_info
+                    and tor_info.site_name
+                    and tor_info.pieces_hash
+                    and tor_info.get_name_pieces_tag() in site_pieces_hash_set
+            ):
+                local_cnt = local_cnt + 1
+            else:
+                not_local_tors.append(tor_info)
+        logger.info(f"站点{site_config.name}正在做种或已经辅种过的种子数为{local_cnt}")
 
-            for tor_info in not_local_tors:
-                if self._event.is_set():
-                    logger.info("辅种服务停止")
+        tasks = []
+        cached_cnt = 0
+        for tor_info in not_local_tors:
+            if not tor_info:
+                continue
+            if not tor_info.torrent_id or not tor_info.pieces_hash:
+                continue
+            cache_key = SeedStore.key(service.name, site_config.name, tor_info.torrent_id)
+            cache_status = self._seed_store.get(cache_key)
+            if cache_status == SeedStore.SUCCESS:
+                logger.warning(f"种子 {tor_info.get_name_id_tag()} 已存在于辅种成功缓存，跳过 ...")
+                cached_cnt += 1
+                continue
+            if cache_status == SeedStore.ERROR:
+                logger.warning(f"种子 {tor_info.get_name_id_tag()} 已存在于辅种失败缓存，跳过 ...")
+                cached_cnt += 1
+                continue
+            tasks.append((tor_info, cache_key))
+
+        if self._seed_plan:
+            # 预演模式只记录计划，不下载添加
+            self._seed_plan.add_site_result(
+                downloader=service.name, site=site_config.name, matched=len(remote_tors),
+                local=local_cnt, cached=cached_cnt,
+                tasks=[(tor.pieces_hash, tor.torrent_id, save_paths.get(tor.pieces_hash)) for tor, _ in tasks])
+            return not self._event.is_set()
+
+        return self.__download_and_add(tasks=tasks, site_config=site_config,
+                                       service=service, save_paths=save_paths)
+
+    def __download_and_add(self, tasks: List[Tuple[TorInfo, CacheKey]], site_config: CSSiteConfig,
+                           service: ServiceInfo, save_paths: Dict[str, str]) -> bool:
+        """
+        下载种子文件并添加到下载器
+        种子文件按站点限速并发下载，下载完成后放入有界队列，由添加线程攒批添加到下载器，
+        各站点添加到同一下载器的并发数合计不超过添加线程数
+        :return: 是否完成，服务停止时返回False
+        """
+        if not tasks:
+            return not self._event.is_set()
+
+        add_queue: Queue = Queue(maxsize=self._add_queue_size)
+        # 同一时间只有一个添加线程在攒批次，其他线程添加已攒好的批次
+        collect_lock = Lock()
+        add_semaphore = self.__get_add_semaphore(service)
+
+        def download_worker(tor: TorInfo, cache_key: CacheKey):
+            if self._event.is_set():
+                return
+            content = self._torrent_cache.get(site_config.name, tor.torrent_id) if self._torrent_cache else None
+            if content:
+                self.__count(total=1, realtotal=1, cachehit=1)
+                logger.info(f"使用缓存的种子文件：{tor.get_name_id_tag()}")
+            else:
+                content = self.__download_torrent(tor=tor, site_config=site_config, cache_key=cache_key)
+                if not content:
                     return
-                if not tor_info:
-                    continue
-                if not tor_info.torrent_id or not tor_info.pieces_hash:
-                    continue
-                if tor_info.torrent_id in success_cache:
-                    logger.warning(f"种子 {tor_info.get_name_id_tag()} 已存在于辅种成功缓存，跳过 ...")
-                    continue
-                if tor_info.torrent_id in error_cache:
-                    logger.warning(f"种子 {tor_info.get_name_id_tag()} 已存在于辅种失败缓存，跳过 ...")
+            # 队列已满时等待添加线程处理
+            while not self._event.is_set():
+                try:
+                    add_queue.put((tor, cache_key, content), timeout=1)
+                    return
+                except Full:
                     continue
-                # 添加任务
-                self.__download_torrent(tor=tor_info, site_config=site_config,
-                                        service=service,
-                                        save_path=save_paths.get(tor_info.pieces_hash),
-                                        success_cache=success_cache,
-                                        fail_cache=fail_cache,
-                                        error_cache=error_cache)
-
-            cache_data["success"] = self.__trim_seed_cache(success_cache)
-            cache_data["fail"] = fail_cache
-            cache_data["error"] = self.__trim_seed_cache(error_cache)
-            self.set_plugin_data(f"{service.name}{self.key_sep}{site_config.name}", cache_data)
 
-        logger.info(f"下载器 {service.name} 辅种完成")
+        def add_worker():
+            finished = False
+            while not finished:
+                with collect_lock:
+                    item = add_queue.get()
+                    if item is None:
+                        return
+                    # 下载受站点限速，种子逐个到达，等待一段时间攒够一批后一起添加
+                    batch = [item]
+                    deadline = time.monotonic() + self._add_batch_wait
+                    while len(batch) < self._add_batch_size and not self._event.is_set():
+                        try:
+                            item = add_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                        except Empty:
+                            break
+                        if item is None:
+                            finished = True
+                            break
+                        batch.append(item)
+                if self._event.is_set():
+                    continue
+                try:
+                    with add_semaphore:
+                        self._run_stats.add_count("add", len(batch))
+                        with self._run_stats.stage("add"):
+                            self.__add_torrents(items=batch, service=service, save_paths=save_paths)
+                except Exception as e:
+                    logger.error(f"站点{site_config.name}添加种子出错：{str(e)}")
+
+        add_workers = max(1, self._addthreads)
+        with ThreadPoolExecutor(max_workers=add_workers, thread_name_prefix="CrossSeedAdd") as add_executor:
+            for _ in range(add_workers):
+                add_executor.submit(add_worker)
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, min(self._downloadthreads, len(tasks))),
+                                        thread_name_prefix="CrossSeedDownload") as download_executor:
+                    futures = [download_executor.submit(download_worker, tor, cache_key)
+                               for tor, cache_key in tasks]
+                    for future in futures:
+                        try:
+                            future.result()
+                        except Exception as e:
+                            logger.error(f"站点{site_config.name}下载种子出错：{str(e)}")
+            finally:
+                # 通知添加线程结束
+                for _ in range(add_workers):
+                    add_queue.put(None)
+        return not self._event.is_set()
+
+    def __get_download_limiter(self, site_config: CSSiteConfig) -> TokenBucket:
+        """
+        获取站点种子下载限速器
+        """
+        with self._limiter_lock:
+            limiter = self._download_limiters.get(site_config.name)
+            if not limiter:
+                limiter = TokenBucket(rate=self._site_download_rate, event=self._event)
+                self._download_limiters[site_config.name] = limiter
+            return limiter
+
+    def __get_add_semaphore(self, service: ServiceInfo) -> BoundedSemaphore:
+        """
+        获取下载器添加种子的并发数限制
+        """
+        with self._limiter_lock:
+            semaphore = self._add_semaphores.get(service.name)
+            if not semaphore:
+                semaphore = BoundedSemaphore(max(1, self._addthreads))
+                self._add_semaphores[service.name] = semaphore
+            return semaphore
+
+    def __count(self, **kwargs):
+        """
+        线程安全地累加辅种计数
+        """
+        with self._counter_lock:
+            for name, value in kwargs.items():
+                setattr(self, name, getattr(self, name) + value)
 
     def __download(self, service: ServiceInfo, content: Union[bytes, str],
                    save_path: str) -> Optional[str]:
@@ -1137,132 +2682,230 @@ class CrossSeed(_PluginBase):
             self,
             tor: TorInfo,
             site_config: CSSiteConfig,
-            service: ServiceInfo,
-            save_path: str,
-            success_cache: list,
-            fail_cache: list,
-            error_cache: list
-    ):
+            cache_key: CacheKey
+    ) -> Optional[bytes]:
         """
-        下载种子
-
+        下载种子文件
+        :return: 种子内容，下载失败或服务停止时返回None
         """
-        logger.info(f"正在下载种子：{tor.get_name_id_tag()}")
-
-        self.total += 1
-        self.realtotal += 1
-
-        # 下载种子
-        torrent_url = site_config.get_torrent_url(tor.torrent_id)
-        logger.debug(f"种子下载链接：{torrent_url}")
-
-        # 下载种子文件
-        _, content, _, _, error_msg = TorrentHelper().download_torrent(
-            url=torrent_url,
-            cookie=site_config.cookie,
-            ua=site_config.ua,
-            proxy=True if site_config.proxy else False)
+        result = self.__fetch_torrent(tor=tor, site_config=site_config)
+        if not result:
+            return None
+        content, error_msg, shared = result
+        if shared:
+            self.__count(total=1, cachehit=0 if not content or error_msg else 1)
+        else:
+            self.__count(total=1, realtotal=1)
 
         # 兼容种子无法访问的情况
         if not content or error_msg:
             # 下载失败
-            self.fail += 1
-            self.cached += 1
+            self.__count(fail=1, cached=1)
+            self._run_stats.add_error(site_config.name)
             # 加入失败缓存
             if error_msg and re.search(r"状态码：404|磁力链接", error_msg):
-                error_cache.append(tor.torrent_id)
+                self._seed_store.add(cache_key, SeedStore.ERROR, ttl=self._error_cache_days * 86400)
             else:
-                fail_cache.append(tor.torrent_id)
+                self._seed_store.add(cache_key, SeedStore.FAIL)
             logger.warning(f"种子文件 {tor.get_name_id_tag()} 下载失败：{error_msg}")
-            return False
+            return None
+        return content
 
-        # 添加任务前查询校验一次，避免重复添加，导致暂停的任务被重新开始
-        tmp_tor_info, err_msg = TorInfo.from_data(content)
-        if tmp_tor_info and tmp_tor_info.info_hash:
-            tors, msg = service.instance.get_torrents(ids=[tmp_tor_info.info_hash])
-            if tors:
-                self.exist += 1
+    def __fetch_torrent(self, tor: TorInfo,
+                        site_config: CSSiteConfig) -> Optional[Tuple[Optional[bytes], Optional[str], bool]]:
+        """
+        按站点限速下载种子文件，其他下载器正在下载同一种子时等待并共用其下载结果
+        :return: 种子内容、错误信息、是否共用其他下载器的下载结果，服务停止时返回None
+        """
+        key = (site_config.name, tor.torrent_id)
+        with self._inflight_lock:
+            future = self._inflight_downloads.get(key)
+            shared = future is not None
+            if not shared:
+                future = Future()
+                self._inflight_downloads[key] = future
+        if shared:
+            logger.info(f"种子 {tor.get_name_id_tag()} 正在由其他下载器下载，等待下载结果")
+            result = future.result()
+            return (*result, True) if result else None
+
+        result = None
+        try:
+            if not self.__get_download_limiter(site_config).acquire():
+                return None
+            logger.info(f"正在下载种子：{tor.get_name_id_tag()}")
+
+            # 下载种子
+            torrent_url = site_config.get_torrent_url(tor.torrent_id)
+            logger.debug(f"种子下载链接：{torrent_url}")
+
+            # 下载种子文件
+            self._run_stats.add_count("download")
+            with self._run_stats.stage("download"):
+                content, error_msg = self.cross_helper.download_torrent(site=site_config,
+                                                                        torrent_url=torrent_url,
+                                                                        session=self.__get_site_session(site_config))
+            if content and not error_msg and self._torrent_cache and isinstance(content, bytes):
+                self._torrent_cache.put(site_config.name, tor.torrent_id, content)
+            result = (content, error_msg)
+            return content, error_msg, False
+        finally:
+            # 下载完成后不再保留，之后的下载器从种子文件缓存读取
+            with self._inflight_lock:
+                self._inflight_downloads.pop(key, None)
+            future.set_result(result)
+
+    def __add_torrents(self, items: List[Tuple[TorInfo, CacheKey, bytes]],
+                       service: ServiceInfo, save_paths: Dict[str, str]):
+        """
+        批量添加种子到下载器，qb中保存路径相同的种子一次添加并一次触发校验
+        每个种子单独处理出错，出错的种子记为失败，不影响同批次的其他种子
+        """
+        pending: Dict[str, list] = {}
+        for tor, cache_key, content in items:
+            try:
+                # 添加任务前查询校验一次，避免重复添加，导致暂停的任务被重新开始
+                tmp_tor_info, err_msg = TorInfo.from_data(content)
+                info_hash = tmp_tor_info.info_hash if tmp_tor_info else None
+                if info_hash:
+                    if self.__torrent_exists(service=service, info_hash=info_hash, tor=tor):
+                        self.__count(exist=1)
+                        logger.warning(f"下载的种子 {tor.get_name_id_tag()} 已存在, 跳过")
+                        continue
+                else:
+                    logger.warning(f"种子文件 {tor.get_name_id_tag()} 解析失败：{err_msg}")
+                save_path = save_paths.get(tor.pieces_hash)
+                if service.type == "qbittorrent" and info_hash:
+                    pending.setdefault(save_path, []).append((tor, cache_key, content, info_hash))
+                    continue
+                # 添加下载，辅种任务默认暂停
+                logger.info(f"添加下载任务：{tor.get_name_id_tag()} ...")
+                download_id = self.__download(service=service, content=content, save_path=save_path)
+            except Exception as e:
+                logger.error(f"{service.name} 添加种子 {tor.get_name_id_tag()} 出错：{str(e)}")
+                download_id = None
+            self.__on_torrent_added(service=service, tor=tor, cache_key=cache_key, download_id=download_id)
+            if download_id and service.type == "qbittorrent":
+                self.__recheck_torrents(service=service, ids=[download_id])
+
+        for save_path, group in pending.items():
+            self.__add_qb_torrents(service=service, save_path=save_path, group=group)
+
+    def __add_qb_torrents(self, service: ServiceInfo, save_path: str,
+                          group: List[Tuple[TorInfo, CacheKey, bytes, str]]):
+        """
+        一次请求向qb添加多个保存路径相同的种子，并一次触发全部校验
+        qb只要有一个种子添加成功就返回Ok.，且种子在后台异步加载，需逐个确认种子已出现在下载器中，
+        只校验已出现的种子，其余种子记为添加失败
+        """
+        # 不同站点种子的info_hash可能相同，同一批次中只添加一次
+        unique_group = []
+        info_hashes = set()
+        for tor, cache_key, content, info_hash in group:
+            if info_hash in info_hashes:
+                self.__count(exist=1)
                 logger.warning(f"下载的种子 {tor.get_name_id_tag()} 已存在, 跳过")
-                return True
-            elif msg:
-                logger.warning(f"从下载器获取种子 {tor.get_name_id_tag()} 失败：{err_msg}")
-        else:
-            logger.warning(f"种子文件 {tor.get_name_id_tag()} 解析失败：{err_msg}")
+                continue
+            info_hashes.add(info_hash)
+            unique_group.append((tor, cache_key, content, info_hash))
+        group = unique_group
+        logger.info(f"添加下载任务：{', '.join(tor.get_name_id_tag() for tor, _, _, _ in group)} ...")
+        added = set()
+        try:
+            result = service.instance.qbc.torrents_add(
+                torrent_files=[content for _, _, content, _ in group],
+                save_path=save_path or None,
+                is_paused=True,
+                tags=self._addlabels_list or None,
+                use_auto_torrent_management=False if save_path else None)
+        except Exception as e:
+            result = None
+            logger.error(f"{service.name} 批量添加种子出错：{str(e)}")
+        if result and str(result).startswith("Ok"):
+            added = self.__confirm_qb_torrents(service=service,
+                                               info_hashes=[info_hash for _, _, _, info_hash in group])
+        for tor, cache_key, _, info_hash in group:
+            self.__on_torrent_added(service=service, tor=tor, cache_key=cache_key,
+                                    download_id=info_hash if info_hash in added else None)
+        if added:
+            self.__recheck_torrents(service=service, ids=list(added))
+
+    def __confirm_qb_torrents(self, service: ServiceInfo, info_hashes: List[str]) -> set:
+        """
+        等待qb加载批量添加的种子
+        :return: 已出现在下载器中的种子hash，超过最大查询次数仍未出现的种子视为添加失败
+        """
+        added = set()
+        for i in range(self._add_confirm_retries):
+            if i and self._event.wait(self._add_confirm_interval):
+                break
+            pending = [info_hash for info_hash in info_hashes if info_hash not in added]
+            try:
+                torrents, error = service.instance.get_torrents(ids=pending)
+            except Exception as e:
+                logger.warning(f"{service.name} 查询添加的种子出错：{str(e)}")
+                continue
+            if error:
+                logger.warning(f"{service.name} 查询添加的种子失败，稍后重试")
+                continue
+            added.update(self.__get_hash(torrent, service.type).lower() for torrent in torrents or [])
+            if len(added) >= len(info_hashes):
+                break
+        return added
+
+    @staticmethod
+    def __recheck_torrents(service: ServiceInfo, ids: List[str]):
+        """
+        qb 添加种子后需要手动重新校验，校验请求出错时种子保留在待校验清单中，超时后不再检查
+        """
+        try:
+            service.instance.recheck_torrents(ids=ids)
+        except Exception as e:
+            logger.error(f"{service.name} 校验种子出错：{str(e)}")
 
-        # 添加下载，辅种任务默认暂停
-        logger.info(f"添加下载任务：{tor.get_name_id_tag()} ...")
-        download_id = self.__download(service=service,
-                                      content=content,
-                                      save_path=save_path)
+    def __torrent_exists(self, service: ServiceInfo, info_hash: str, tor: TorInfo) -> bool:
+        """
+        判断种子是否已在下载器中
+        """
+        torrent_hashes = self._torrent_hashes.get(service.name)
+        if torrent_hashes is not None:
+            # 使用任务开始时获取的下载器种子快照判断
+            return info_hash in torrent_hashes
+        tors, msg = service.instance.get_torrents(ids=[info_hash])
+        if not tors and msg:
+            logger.warning(f"从下载器获取种子 {tor.get_name_id_tag()} 失败")
+        return bool(tors)
+
+    def __on_torrent_added(self, service: ServiceInfo, tor: TorInfo, cache_key: CacheKey,
+                           download_id: Optional[str]):
+        """
+        记录种子添加结果
+        """
         if not download_id:
             # 下载失败
-            self.fail += 1
-            self.cached += 1
+            self.__count(fail=1, cached=1)
             # 加入失败缓存
-            fail_cache.append(tor.torrent_id)
+            self._seed_store.add(cache_key, SeedStore.FAIL)
             logger.warning(f"下载任务 {tor.get_name_id_tag()} 添加失败")
-            return False
-        else:
-            self.success += 1
-            # 加入成功缓存
-            success_cache.append(tor.torrent_id)
+            return
+        self.__count(success=1)
+        # 加入成功缓存
+        self._seed_store.add(cache_key, SeedStore.SUCCESS)
+        with self._counter_lock:
+            if self._torrent_hashes.get(service.name) is not None:
+                self._torrent_hashes[service.name].add(download_id)
             self.__add_recheck_torrents(service, download_id)
-            if service.type == "qbittorrent":
-                # qb 需要手动重新检验
-                service.instance.recheck_torrents(ids=[download_id])
-            # 下载成功
-            logger.info(f"成功添加辅种下载，站点种子：{tor.get_name_id_tag()}")
-            return True
+        # 下载成功
+        logger.info(f"成功添加辅种下载，站点种子：{tor.get_name_id_tag()}")
 
     def __add_recheck_torrents(self, service: ServiceInfo, download_id: str):
         # 追加校验任务
         # logger.info(f"添加校验检查任务：{download_id} ...")
-        if not self._recheck_torrents.get(service.name):
-            self._recheck_torrents[service.name] = []
-        self._recheck_torrents[service.name].append(download_id)
-
-    def get_plugin_data(self, key: str, default: Any = None):
-        """
-        获取插件数据，支持多层结构的key
-        """
-        key_list = key.split(self.key_sep)
-        top_key = key_list.pop(0)
-        res = None
-        if top_key:
-            res = self.__get_plugin_data(key_list, self.get_data(top_key))
-        return res or default
-
-    def __get_plugin_data(self, key_list: list[str], data: Any):
-        if not data or len(key_list) == 0:
-            return data
-        key = key_list.pop(0)
-        res = None
-        if key:
-            res = self.__get_plugin_data(key_list, data.get(key))
-        return res
-
-    def set_plugin_data(self, key: str, value: Any):
-        """
-        保存插件数据，支持多层结构的key
-        """
-        key_list = key.split(self.key_sep)
-        top_key = key_list.pop(0)
-        if top_key:
-            top_value = self.__set_plugin_data(key_list, self.get_data(top_key), value)
-            if top_value:
-                self.save_data(top_key, top_value)
-
-    def __set_plugin_data(self, key_list: list[str], data: Any, value: Any):
-        if len(key_list) == 0:
-            return value
-        key = key_list.pop(0)
-        if key:
-            if data is None:
-                data = {}
-            res = self.__set_plugin_data(key_list, data.get(key), value)
-            if res:
-                data[key] = res
-        return data
+        with self._recheck_lock:
+            self._recheck_torrents.setdefault(service.name, {})[download_id.lower()] = time.time()
+            # 有新的校验任务时恢复最短检查间隔
+            self._recheck_level = 0
+            self._recheck_next_at = time.time() + self._recheck_intervals[0] * 60
 
     @staticmethod
     def __get_hash(torrent: Any, dl_type: str):
@@ -1287,6 +2930,17 @@ class CrossSeed(_PluginBase):
             print(str(e))
             return []
 
+    @staticmethod
+    def __is_completed(torrent: Any, dl_type: str):
+        """
+        判断种子是否已下载完成
+        """
+        try:
+            return torrent.get("progress") == 1 if dl_type == "qbittorrent" else torrent.percent_done == 1
+        except Exception as e:
+            print(str(e))
+            return False
+
     @staticmethod
     def __can_seeding(torrent: Any, dl_type: str):
         """
@@ -1310,6 +2964,23 @@ class CrossSeed(_PluginBase):
             print(str(e))
             return ""
 
+    @staticmethod
+    def __stat_file(file_path: Path) -> Optional[os.stat_result]:
+        """
+        获取文件状态，文件不存在时返回None
+        """
+        try:
+            return file_path.stat()
+        except OSError:
+            return None
+
+    @staticmethod
+    def __to_int(value: Any, default: int) -> int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
     @staticmethod
     def __is_string_not_empty(value: str):
         return True if value and not value.isspace() else False
@@ -1319,6 +2990,11 @@ class CrossSeed(_PluginBase):
         退出插件
         """
         try:
+            with self._event_lock:
+                if self._event_timer:
+                    self._event_timer.cancel()
+                    self._event_timer = None
+                self._event_torrents = {}
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
@@ -1326,6 +3002,7 @@ class CrossSeed(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            self.__close_site_sessions()
         except Exception as e:
             print(str(e))
 
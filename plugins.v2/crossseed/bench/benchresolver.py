@@ -0,0 +1,65 @@
+"""
+tracker站点解析微基准：逐个站点passkey子串匹配 + 逐个tracker查询站点索引 对比 TrackerSiteResolver
+
+    python3 plugins.v2/crossseed/bench/benchresolver.py --torrents 50000 --sites 60
+"""
+import argparse
+import random
+import secrets
+import time
+
+import host
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tracker站点解析微基准")
+    parser.add_argument("--torrents", type=int, default=50000, help="种子数")
+    parser.add_argument("--sites", type=int, default=60, help="辅种站点数")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    args = parser.parse_args()
+
+    host.install()
+    from app.plugins.crossseed.siteresolver import TrackerSiteResolver
+    from app.utils.string import StringUtils
+
+    rnd = random.Random(args.seed)
+    site_passkeys = {secrets.token_hex(16): f"site{i}" for i in range(args.sites)}
+    indexers = {f"tr{i}.example.org": {"name": f"site{i}"} for i in range(args.sites)}
+    # 一半tracker带passkey，一半只能按域名匹配
+    trackers = [f"https://tr{i}.example.org/announce.php?passkey={passkey}"
+                for i, passkey in enumerate(site_passkeys)] + \
+               [f"https://tr{i}.example.org/announce" for i in range(args.sites)]
+    torrents = [[rnd.choice(trackers)] for _ in range(args.torrents)]
+
+    def nested_loop():
+        results = []
+        for tracker_urls in torrents:
+            site_name = None
+            for tracker in tracker_urls:
+                for passkey, name in site_passkeys.items():
+                    if passkey in tracker:
+                        site_name = name
+                        break
+                if not site_name:
+                    site_info = indexers.get(StringUtils.get_url_domain(tracker))
+                    site_name = site_info.get("name") if site_info else None
+            results.append(site_name)
+        return results
+
+    def resolver():
+        site_resolver = TrackerSiteResolver(site_passkeys, indexers.get)
+        return [site_resolver.resolve(tracker_urls) for tracker_urls in torrents]
+
+    expected = None
+    for name, func in [("嵌套循环", nested_loop), ("TrackerSiteResolver", resolver)]:
+        start_time = time.perf_counter()
+        results = func()
+        elapsed = time.perf_counter() - start_time
+        # 两种方式的结果必须一致
+        assert expected is None or results == expected
+        expected = results
+        print(f"{name:<20}{elapsed:>8.3f} 秒{elapsed / len(torrents) * 1e6:>10.2f} 微秒/种子")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+辅种全流程基准测试：合成种子语料 + 本地站点替身 + 内存下载器，不访问真实站点和下载器
+
+    python3 plugins.v2/crossseed/bench/benchrun.py --torrents 2000 --sites 3 --downloaders qbittorrent,transmission
+
+输出端到端和各阶段吞吐、站点请求数和下载器接口调用次数，用于发现扫描、查询、下载和添加速度的退化
+需要安装主程序的依赖（requests、bencode.py、pytz、apscheduler）
+"""
+import argparse
+import logging
+import random
+import shutil
+import time
+from pathlib import Path
+from typing import List
+
+import host
+from corpus import build_corpus
+from fakedownloader import FakeDownloader, FakeQbittorrent, FakeTransmission
+from stubsite import StubSite
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="青蛙辅种助手基准测试")
+    parser.add_argument("--torrents", type=int, default=1000, help="本地种子数")
+    parser.add_argument("--pieces", type=int, default=64, help="每个种子的平均分块数")
+    parser.add_argument("--sites", type=int, default=2, help="站点数")
+    parser.add_argument("--match", type=float, default=0.1, help="每个站点上可辅种的种子比例")
+    parser.add_argument("--latency", type=float, default=0.02, help="站点响应延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="站点返回500的比例")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="站点返回限流提示的比例")
+    parser.add_argument("--site-status", type=int, default=None,
+                        help="最后一个站点所有请求都返回该状态码，如401模拟passkey错误")
+    parser.add_argument("--gap", type=float, default=0, help="站点查询最小间隔（秒）")
+    parser.add_argument("--download-rate", type=float, default=None, help="每个站点每秒下载种子数，默认使用插件配置")
+    parser.add_argument("--downloaders", default="qbittorrent", help="下载器类型，逗号分隔：qbittorrent,transmission")
+    parser.add_argument("--overlap", type=float, default=0.0, help="同时存在于所有下载器中的种子比例")
+    parser.add_argument("--export-ratio", type=float, default=0.0, help="qb中没有种子文件需要导出的比例")
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="下载器接口调用延迟（秒）")
+    parser.add_argument("--qb-load-delay", type=float, default=0.0, help="qb后台加载添加的种子的时间（秒）")
+    parser.add_argument("--parse-workers", type=int, default=0, help="解析种子文件的进程数，0为自动")
+    parser.add_argument("--query-threads", type=int, default=8)
+    parser.add_argument("--download-threads", type=int, default=4)
+    parser.add_argument("--add-threads", type=int, default=2)
+    parser.add_argument("--query-cache-days", type=int, default=7)
+    parser.add_argument("--no-fastscan", action="store_true", help="关闭qb快速扫描")
+    parser.add_argument("--dry-run", action="store_true", help="只预演生成辅种计划")
+    parser.add_argument("--runs", type=int, default=1, help="连续运行次数，后续运行使用已有的索引和缓存")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出插件日志")
+    return parser.parse_args()
+
+
+def build_downloaders(args, corpus, workdir: Path) -> List[FakeDownloader]:
+    rnd = random.Random(args.seed)
+    downloaders = []
+    for idx, dl_type in enumerate(args.downloaders.split(",")):
+        name, torrent_dir = f"{dl_type.strip()}{idx}", workdir / f"torrents{idx}"
+        if dl_type.strip() == "qbittorrent":
+            downloaders.append(FakeQbittorrent(name=name, torrent_dir=torrent_dir, rpc_latency=args.rpc_latency,
+                                               load_delay=args.qb_load_delay))
+        else:
+            downloaders.append(FakeTransmission(name=name, torrent_dir=torrent_dir, rpc_latency=args.rpc_latency))
+    for i, torrent in enumerate(corpus):
+        owners = downloaders if rnd.random() < args.overlap else [downloaders[i % len(downloaders)]]
+        for downloader in owners:
+            write_file = downloader.type != "qbittorrent" or rnd.random() >= args.export_ratio
+            downloader.seed(torrent, save_path=f"/data/{downloader.name}", write_file=write_file)
+    return downloaders
+
+
+def build_sites(args, corpus) -> List[StubSite]:
+    rnd = random.Random(args.seed)
+    sites = []
+    for idx in range(args.sites):
+        last = idx == args.sites - 1
+        site = StubSite(name=f"site{idx}", passkey=f"{idx:02d}" + "ab" * 15, latency=args.latency,
+                        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                        status=args.site_status if last else None, seed=args.seed + idx)
+        site.publish(torrent for torrent in corpus if rnd.random() < args.match)
+        sites.append(site.start())
+    return sites
+
+
+def report(run: int, elapsed: float, sites: List[StubSite], downloaders: List[FakeDownloader]):
+    stats = (host.host.plugin_data.get("run_stats") or [{}])[0]
+    print(f"\n== 第 {run} 次运行（{stats.get('kind')}）：{elapsed:.2f} 秒，"
+          f"端到端 {(stats.get('throughput') or {}).get('total')} 种子/秒")
+    print(f"{'阶段':<10}{'耗时(秒)':>10}{'数量':>10}{'每秒':>10}")
+    for stage, seconds in (stats.get("stages") or {}).items():
+        print(f"{stage:<10}{seconds:>10}{stats['counts'].get(stage):>10}{str(stats['throughput'].get(stage)):>10}")
+    print("计数：" + "，".join(f"{name} {value}" for name, value in (stats.get("counters") or {}).items()))
+    for site in sites:
+        downloads = sum(site.downloads.values())
+        print(f"站点 {site.name}：查询请求 {site.requests['query']}，查询种子 {site.requests['hashes']}，"
+              f"下载 {downloads}（不同种子 {len(site.downloads)}），"
+              f"错误 {sum(cnt for key, cnt in site.requests.items() if key.isdigit())}")
+    for downloader in downloaders:
+        print(f"下载器 {downloader.name}：辅种种子 {downloader.added}，接口调用 {sum(downloader.calls.values())} 次 "
+              + str(dict(downloader.calls)))
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format="%(asctime)s %(threadName)s %(message)s")
+    bench_host = host.install()
+    from app.plugins.crossseed import CrossSeed
+
+    workdir = bench_host.data_path
+    start_time = time.perf_counter()
+    corpus = build_corpus(args.torrents, pieces=args.pieces, seed=args.seed)
+    sites = build_sites(args, corpus)
+    downloaders = build_downloaders(args, corpus, workdir)
+    print(f"生成语料 {len(corpus)} 个种子，{len(sites)} 个站点，{len(downloaders)} 个下载器，"
+          f"用时 {time.perf_counter() - start_time:.2f} 秒，工作目录 {workdir}")
+
+    bench_host.indexers = [{"id": idx + 1, "name": site.name, "url": site.url, "domain": f"{site.name}.example.org",
+                            "cookie": "", "ua": "crossseed-bench", "proxy": False}
+                           for idx, site in enumerate(sites)]
+    bench_host.services = {downloader.name: host.ServiceInfo(name=downloader.name, type=downloader.type,
+                                                             instance=downloader)
+                           for downloader in downloaders}
+    plugin = CrossSeed()
+    plugin.init_plugin({
+        "enabled": True,
+        "notify": True,
+        "downloaders": [downloader.name for downloader in downloaders],
+        "sites": [indexer.get("id") for indexer in bench_host.indexers],
+        "token": "\n".join(f"{site.name}:{site.passkey}" for site in sites),
+        "torrentpath": "\n".join(str(downloader.torrent_dir) for downloader in downloaders),
+        "parseworkers": args.parse_workers,
+        "querythreads": args.query_threads,
+        "querycachedays": args.query_cache_days,
+        "downloadthreads": args.download_threads,
+        "addthreads": args.add_threads,
+        "fastscan": not args.no_fastscan,
+        "dryrun": args.dry_run
+    })
+    for site_config in plugin._site_cs_infos:
+        site_config.query_gap = args.gap
+    if args.download_rate is not None:
+        plugin._site_download_rate = args.download_rate
+    try:
+        for run in range(1, args.runs + 1):
+            for item in sites + downloaders:
+                item.reset_stats()
+            start_time = time.perf_counter()
+            plugin.auto_seed()
+            elapsed = time.perf_counter() - start_time
+            plugin.check_recheck(force=True)
+            report(run, elapsed, sites, downloaders)
+    finally:
+        plugin.stop_service()
+        for site in sites:
+            site.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+种子 hash 计算微基准：原始字节区间直接 sha1（bytes / mmap）对比 bdecode + bencode 往返
+
+    python3 plugins.v2/crossseed/bench/benchscan.py --torrents 2000 --pieces 1000
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import host
+from corpus import build_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="种子hash计算微基准")
+    parser.add_argument("--torrents", type=int, default=2000, help="种子数")
+    parser.add_argument("--pieces", type=int, default=1000, help="每个种子的平均分块数")
+    parser.add_argument("--files", type=int, default=20, help="每个种子的文件数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取平均值")
+    args = parser.parse_args()
+
+    host.install()
+    from app.plugins.crossseed import torrentscan
+
+    workdir = Path(tempfile.mkdtemp(prefix="crossseed-scan-"))
+    try:
+        corpus = build_corpus(args.torrents, pieces=args.pieces, files=args.files)
+        paths = []
+        for torrent in corpus:
+            path = workdir / f"{torrent.info_hash}.torrent"
+            path.write_bytes(torrent.data)
+            paths.append(path)
+            # 两种方式的结果必须一致
+            assert torrentscan.hash_torrent(torrent.data)[:2] == (torrent.info_hash, torrent.pieces_hash)
+            assert torrentscan.hash_torrent_decoded(torrent.data)[:2] == (torrent.info_hash, torrent.pieces_hash)
+        size = sum(len(torrent.data) for torrent in corpus)
+        print(f"{len(corpus)} 个种子，共 {size / 1024 / 1024:.1f} MB")
+        cases = [
+            ("bdecode+bencode", lambda: [torrentscan.hash_torrent_decoded(path.read_bytes()) for path in paths]),
+            ("scan(bytes)", lambda: [torrentscan.hash_torrent(path.read_bytes()) for path in paths]),
+            ("scan(mmap)", lambda: [torrentscan.hash_torrent_file(path) for path in paths]),
+        ]
+        for name, func in cases:
+            func()
+            start_time = time.perf_counter()
+            for _ in range(args.repeat):
+                func()
+            elapsed = (time.perf_counter() - start_time) / args.repeat
+            print(f"{name:<18}{elapsed * 1000:>10.1f} ms{len(paths) / elapsed:>12.0f} 个/秒")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
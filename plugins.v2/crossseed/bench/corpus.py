@@ -0,0 +1,64 @@
+"""
+合成种子语料
+"""
+import hashlib
+import os
+import random
+from dataclasses import dataclass
+from typing import List
+
+from bencode import bencode
+
+# 本地种子的 tracker，不属于任何辅种站点
+HOME_TRACKER = "https://home.example.org/announce.php?passkey=home"
+
+
+@dataclass
+class SyntheticTorrent:
+    name: str
+    info: dict
+    data: bytes
+    info_hash: str
+    pieces_hash: str
+
+
+def _torrent(name: str, info: dict, announce: str) -> SyntheticTorrent:
+    data = bencode({"announce": announce, "info": info})
+    return SyntheticTorrent(name=name, info=info, data=data,
+                            info_hash=hashlib.sha1(bencode(info)).hexdigest(),
+                            pieces_hash=hashlib.sha1(info["pieces"]).hexdigest())
+
+
+def make_torrent(name: str, pieces: int, files: int = 1, announce: str = HOME_TRACKER) -> SyntheticTorrent:
+    """
+    生成一个随机内容的种子
+    :param pieces: 分块数，每个分块的 sha1 占 20 字节
+    :param files: 文件数，大于1时生成多文件种子
+    """
+    info = {
+        "name": name,
+        "piece length": 1 << 22,
+        "pieces": os.urandom(20 * pieces),
+    }
+    if files > 1:
+        info["files"] = [{"length": 1024 * (i + 1), "path": [f"dir{i % 4}", f"file{i}.mkv"]} for i in range(files)]
+    else:
+        info["length"] = (1 << 22) * pieces
+    return _torrent(name, info, announce)
+
+
+def build_corpus(count: int, pieces: int = 64, files: int = 1, seed: int = 0) -> List[SyntheticTorrent]:
+    """
+    生成 count 个本地种子，分块数在 [pieces/2, pieces*3/2] 之间随机
+    """
+    rnd = random.Random(seed)
+    return [make_torrent(name=f"bench.{i:06d}", pieces=max(1, rnd.randint(pieces // 2, pieces * 3 // 2)),
+                         files=files)
+            for i in range(count)]
+
+
+def cross_seed_copy(torrent: SyntheticTorrent, source: str, announce: str) -> SyntheticTorrent:
+    """
+    生成站点上与本地种子内容相同的种子，info 中加入 source 字段，info_hash 不同而 pieces_hash 相同
+    """
+    return _torrent(torrent.name, dict(torrent.info, source=source), announce)
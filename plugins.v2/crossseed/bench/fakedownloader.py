@@ -0,0 +1,252 @@
+"""
+内存中的 qBittorrent / Transmission 替身，接口与 ServiceInfo.instance 一致，统计每个接口的调用次数
+"""
+import hashlib
+import threading
+import time
+import types
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from bencode import bdecode, bencode
+
+from corpus import SyntheticTorrent
+
+
+def _info_hash(content: bytes) -> Optional[str]:
+    try:
+        return hashlib.sha1(bencode(bdecode(content)["info"])).hexdigest()
+    except Exception:
+        return None
+
+
+def _ids(ids: Union[str, List[str], None]) -> Optional[set]:
+    if ids is None:
+        return None
+    return {ids.lower()} if isinstance(ids, str) else {i.lower() for i in ids}
+
+
+class FakeDownloader(object):
+    """
+    :param torrent_dir: 种子文件目录，对应插件配置的种子文件目录
+    :param rpc_latency: 每次接口调用的延迟（秒）
+    """
+
+    type = None
+
+    def __init__(self, name: str, torrent_dir: Path, rpc_latency: float = 0.0) -> None:
+        self.name = name
+        self.torrent_dir = Path(torrent_dir)
+        self.torrent_dir.mkdir(parents=True, exist_ok=True)
+        self.rpc_latency = rpc_latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        # {种子hash: 种子}
+        self._torrents: Dict[str, object] = {}
+        # {种子hash: 种子内容}，用于导出
+        self._contents: Dict[str, bytes] = {}
+
+    def _rpc(self, name: str, count: int = 1):
+        with self._lock:
+            self.calls[name] += count
+        if self.rpc_latency:
+            time.sleep(self.rpc_latency)
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+
+    def seed(self, torrent: SyntheticTorrent, save_path: str, write_file: bool = True):
+        """
+        添加一个已完成做种的种子
+        :param write_file: 是否在种子文件目录中保存种子文件，qb不保存时需要插件从下载器导出
+        """
+        self._torrents[torrent.info_hash] = self._make(torrent.info_hash, torrent.name, save_path,
+                                                       tracker=None, done=True)
+        self._contents[torrent.info_hash] = torrent.data
+        if write_file:
+            (self.torrent_dir / f"{torrent.info_hash}.torrent").write_bytes(torrent.data)
+
+    def _make(self, info_hash: str, name: str, save_path: str, tracker: Optional[str], done: bool,
+              labels: Optional[List[str]] = None):
+        raise NotImplementedError
+
+    def _add(self, content: bytes, save_path: str, labels: Optional[List[str]]) -> Optional[str]:
+        info_hash = _info_hash(content)
+        if not info_hash:
+            return None
+        with self._lock:
+            if info_hash in self._torrents:
+                return None
+            self._torrents[info_hash] = self._make(info_hash, info_hash, save_path, tracker=None, done=False,
+                                                   labels=labels)
+            self._contents[info_hash] = content
+        (self.torrent_dir / f"{info_hash}.torrent").write_bytes(content)
+        return info_hash
+
+    @property
+    def added(self) -> int:
+        """
+        辅种添加的种子数
+        """
+        return sum(1 for torrent in self._torrents.values() if not self._is_seeded(torrent))
+
+    def _is_seeded(self, torrent) -> bool:
+        raise NotImplementedError
+
+    def _select(self, ids) -> list:
+        ids = _ids(ids)
+        with self._lock:
+            return [torrent for info_hash, torrent in self._torrents.items() if ids is None or info_hash in ids]
+
+    def is_inactive(self) -> bool:
+        return False
+
+    def get_torrents(self, ids: Union[str, list, None] = None, status: Optional[str] = None,
+                     tags: Optional[str] = None) -> Tuple[list, bool]:
+        self._rpc("get_torrents")
+        return self._select(ids), False
+
+
+class QbTorrent(dict):
+    """
+    qbittorrentapi 的 TorrentDictionary，可按属性访问
+    """
+
+    def __getattr__(self, item):
+        try:
+            return self[item]
+        except KeyError:
+            raise AttributeError(item)
+
+    @property
+    def trackers(self) -> List[dict]:
+        return [{"url": self["tracker"]}] if self.get("tracker") else []
+
+
+class FakeQbittorrent(FakeDownloader):
+    """
+    :param load_delay: 添加的种子在后台加载的时间（秒），加载完成前查询不到，校验请求被忽略
+    """
+
+    type = "qbittorrent"
+
+    def __init__(self, name: str, torrent_dir: Path, rpc_latency: float = 0.0, load_delay: float = 0.0) -> None:
+        super().__init__(name, torrent_dir, rpc_latency)
+        self.load_delay = load_delay
+        self.qbc = types.SimpleNamespace(torrents_add=self._torrents_add,
+                                         torrents_export=self._torrents_export,
+                                         torrents_info=self._torrents_info)
+        self._added_on = 0
+
+    def _make(self, info_hash: str, name: str, save_path: str, tracker: Optional[str], done: bool,
+              labels: Optional[List[str]] = None):
+        self._added_on += 1
+        return QbTorrent(hash=info_hash, name=name, save_path=save_path, tags=", ".join(labels or []),
+                         tracker=tracker or "", state="uploading" if done else "pausedDL",
+                         progress=1 if done else 0, added_on=self._added_on, seeded=done,
+                         loaded_at=0 if done else time.monotonic() + self.load_delay)
+
+    def _select(self, ids) -> list:
+        now = time.monotonic()
+        return [torrent for torrent in super()._select(ids) if torrent["loaded_at"] <= now]
+
+    def _is_seeded(self, torrent) -> bool:
+        return torrent["seeded"]
+
+    def seed(self, torrent: SyntheticTorrent, save_path: str, write_file: bool = True):
+        super().seed(torrent, save_path, write_file)
+        self._torrents[torrent.info_hash]["tracker"] = bdecode(torrent.data).get("announce")
+
+    def get_completed_torrents(self, ids=None, tags=None) -> list:
+        self._rpc("get_completed_torrents")
+        return [torrent for torrent in self._select(ids) if torrent["progress"] == 1]
+
+    def add_torrent(self, content: bytes, is_paused: bool = False, download_dir: Optional[str] = None,
+                    tag: Optional[List[str]] = None, **kwargs) -> bool:
+        self._rpc("add_torrent")
+        return bool(self._add(content, download_dir, tag))
+
+    def get_torrent_id_by_tag(self, tags, status: Optional[str] = None) -> Optional[str]:
+        self._rpc("get_torrent_id_by_tag")
+        tags = set([tags] if isinstance(tags, str) else tags)
+        for torrent in self._select(None):
+            if tags <= {tag.strip() for tag in torrent["tags"].split(",")}:
+                return torrent["hash"]
+        return None
+
+    def recheck_torrents(self, ids) -> bool:
+        self._rpc("recheck_torrents")
+        for torrent in self._select(ids):
+            torrent.update(state="pausedUP", progress=1)
+        return True
+
+    def start_torrents(self, ids) -> bool:
+        self._rpc("start_torrents")
+        for torrent in self._select(ids):
+            torrent.update(state="uploading")
+        return True
+
+    def _torrents_add(self, torrent_files: List[bytes], save_path: Optional[str] = None,
+                      is_paused: bool = False, tags: Optional[List[str]] = None, **kwargs) -> str:
+        self._rpc("torrents_add")
+        added = [self._add(content, save_path, tags) for content in torrent_files]
+        return "Ok." if any(added) else "Fails."
+
+    def _torrents_export(self, torrent_hash: str) -> bytes:
+        self._rpc("torrents_export")
+        content = self._contents.get(torrent_hash.lower())
+        if content is None:
+            raise ValueError(f"种子不存在：{torrent_hash}")
+        return content
+
+    def _torrents_info(self, status_filter: Optional[str] = None, sort: Optional[str] = None,
+                       limit: Optional[int] = None, offset: int = 0, **kwargs) -> List[QbTorrent]:
+        self._rpc("torrents_info")
+        torrents = self._select(None)
+        if status_filter == "completed":
+            torrents = [torrent for torrent in torrents if torrent["progress"] == 1]
+        if sort:
+            torrents.sort(key=lambda torrent: torrent.get(sort))
+        return torrents[offset:offset + limit if limit else None]
+
+
+class FakeTransmission(FakeDownloader):
+    type = "transmission"
+
+    def _make(self, info_hash: str, name: str, save_path: str, tracker: Optional[str], done: bool,
+              labels: Optional[List[str]] = None):
+        return types.SimpleNamespace(hashString=info_hash, name=name, download_dir=save_path,
+                                     labels=list(labels or []), percent_done=1 if done else 0,
+                                     status=types.SimpleNamespace(stopped=not done), seeded=done)
+
+    def _is_seeded(self, torrent) -> bool:
+        return torrent.seeded
+
+    def get_completed_torrents(self, ids=None, tags=None) -> list:
+        self._rpc("get_completed_torrents")
+        return [torrent for torrent in self._select(ids) if torrent.percent_done == 1]
+
+    def add_torrent(self, content: bytes, is_paused: bool = False, download_dir: Optional[str] = None,
+                    labels: Optional[List[str]] = None, **kwargs):
+        self._rpc("add_torrent")
+        info_hash = self._add(content, download_dir, labels)
+        if not info_hash:
+            return None
+        # transmission 添加后自动校验，数据已存在时校验完成即为暂停的完整种子
+        torrent = self._torrents[info_hash]
+        torrent.percent_done = 1
+        return torrent
+
+    def recheck_torrents(self, ids) -> bool:
+        self._rpc("recheck_torrents")
+        for torrent in self._select(ids):
+            torrent.percent_done = 1
+        return True
+
+    def start_torrents(self, ids) -> bool:
+        self._rpc("start_torrents")
+        for torrent in self._select(ids):
+            torrent.status.stopped = False
+        return True
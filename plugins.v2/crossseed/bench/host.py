@@ -0,0 +1,265 @@
+"""
+MoviePilot 主程序接口的最小替身，只实现辅种插件用到的部分，使插件可以脱离主程序加载运行
+install() 把替身注册到 sys.modules，并把插件目录注册为 app.plugins.crossseed 包
+"""
+import importlib.util
+import logging
+import random
+import string
+import sys
+import tempfile
+import types
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+
+logger = logging.getLogger("crossseed")
+
+
+class Settings(object):
+    PROXY = None
+    API_TOKEN = "bench"
+    TZ = "Asia/Shanghai"
+
+
+settings = Settings()
+
+
+class EventManager(object):
+
+    @staticmethod
+    def register(_event_type) -> Callable:
+        return lambda func: func
+
+
+class NotificationType(Enum):
+    SiteMessage = "站点"
+
+
+class EventType(Enum):
+    TransferComplete = "transfer.complete"
+    SiteDeleted = "site.deleted"
+
+
+@dataclass
+class ServiceInfo:
+    name: str
+    type: str
+    instance: Any
+    config: Any = None
+
+
+@dataclass
+class Response:
+    success: bool = False
+    message: Optional[str] = None
+    data: Any = field(default_factory=dict)
+
+
+class StringUtils(object):
+
+    @staticmethod
+    def get_url_domain(url: str) -> str:
+        return urlparse(url).netloc.split(":")[0]
+
+    @staticmethod
+    def generate_random_str(randomlength: int = 16) -> str:
+        return "".join(random.choices(string.ascii_letters + string.digits, k=randomlength))
+
+
+class TimerUtils(object):
+
+    @staticmethod
+    def random_scheduler(**kwargs) -> list:
+        return []
+
+
+class RequestUtils(object):
+    """
+    与主程序相同的调用方式，请求出错时返回None
+    """
+
+    def __init__(self, cookies: Optional[str] = None, ua: Optional[str] = None, proxies: Optional[dict] = None,
+                 content_type: Optional[str] = None, session: Optional[requests.Session] = None,
+                 timeout: int = 20) -> None:
+        self._session = session
+        self._cookies = self.cookie_parse(cookies) if cookies else None
+        self._headers = {}
+        if ua:
+            self._headers["User-Agent"] = ua
+        if content_type:
+            self._headers["Content-Type"] = content_type
+        self._proxies = proxies
+        self._timeout = timeout
+
+    def __request(self, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        try:
+            return (self._session or requests).request(method, url, headers=self._headers, cookies=self._cookies,
+                                                       proxies=self._proxies, timeout=self._timeout, **kwargs)
+        except requests.RequestException:
+            return None
+
+    def post(self, url: str, json: Any = None, **kwargs) -> Optional[requests.Response]:
+        return self.__request("POST", url, json=json, **kwargs)
+
+    def get_res(self, url: str, allow_redirects: bool = True, **kwargs) -> Optional[requests.Response]:
+        return self.__request("GET", url, allow_redirects=allow_redirects, **kwargs)
+
+    @staticmethod
+    def cookie_parse(cookies_str: str) -> Dict[str, str]:
+        cookies = {}
+        for cookie in (cookies_str or "").split(";"):
+            if "=" in cookie:
+                name, value = cookie.split("=", 1)
+                cookies[name.strip()] = value.strip()
+        return cookies
+
+
+class TorrentHelper(object):
+    """
+    主程序的种子下载方法，返回 (种子文件路径, 种子内容, 目录名, 文件列表, 错误信息)
+    """
+
+    def download_torrent(self, url: str, cookie: Optional[str] = None, ua: Optional[str] = None,
+                         proxy: bool = False) -> tuple:
+        response = RequestUtils(cookies=cookie, ua=ua).get_res(url)
+        if response is None:
+            return None, None, "", [], "下载种子出错，无法连接站点"
+        if response.status_code != 200:
+            return None, None, "", [], f"下载种子出错，状态码：{response.status_code}"
+        if not response.content.startswith(b"d"):
+            return None, None, "", [], "下载的种子文件格式错误"
+        return None, response.content, "", [], ""
+
+
+class Host(object):
+    """
+    替身的可配置状态：站点、下载器、插件数据和发送的通知
+    """
+
+    def __init__(self) -> None:
+        # 站点索引 [{"id", "name", "url", "domain", "cookie", "ua", "proxy"}]
+        self.indexers: List[dict] = []
+        # {下载器名称: ServiceInfo}
+        self.services: Dict[str, ServiceInfo] = {}
+        self.plugin_data: Dict[str, Any] = {}
+        self.plugin_config: Dict[str, Any] = {}
+        self.messages: List[dict] = []
+        self.data_path = Path(tempfile.mkdtemp(prefix="crossseed-bench-"))
+
+
+host = Host()
+
+
+class SitesHelper(object):
+
+    @staticmethod
+    def get_indexers() -> List[dict]:
+        return list(host.indexers)
+
+    @staticmethod
+    def get_indexer(domain: str) -> Optional[dict]:
+        for indexer in host.indexers:
+            if indexer.get("domain") == domain:
+                return indexer
+        return None
+
+
+class SiteOper(object):
+
+    @staticmethod
+    def list_order_by_pri() -> list:
+        return [types.SimpleNamespace(id=indexer.get("id"), is_active=True) for indexer in host.indexers]
+
+    @staticmethod
+    def get(site_id: int) -> Any:
+        for indexer in host.indexers:
+            if indexer.get("id") == site_id:
+                return types.SimpleNamespace(id=site_id, is_active=True)
+        return None
+
+
+class DownloaderHelper(object):
+
+    @staticmethod
+    def get_services(name_filters: Optional[List[str]] = None) -> Dict[str, ServiceInfo]:
+        return {name: service for name, service in host.services.items()
+                if not name_filters or name in name_filters}
+
+    @staticmethod
+    def get_configs() -> Dict[str, Any]:
+        return {name: types.SimpleNamespace(name=name, type=service.type, enabled=True)
+                for name, service in host.services.items()}
+
+
+class PluginBase(object):
+    """
+    插件基类，插件数据保存在内存中
+    """
+
+    def get_data(self, key: str) -> Any:
+        return host.plugin_data.get(key)
+
+    def save_data(self, key: str, value: Any):
+        host.plugin_data[key] = value
+
+    def del_data(self, key: str):
+        host.plugin_data.pop(key, None)
+
+    def get_data_path(self) -> Path:
+        return host.data_path
+
+    def update_config(self, config: dict):
+        host.plugin_config[self.__class__.__name__] = dict(config)
+
+    def get_config(self, plugin_id: Optional[str] = None) -> Optional[dict]:
+        return host.plugin_config.get(plugin_id or self.__class__.__name__)
+
+    def post_message(self, mtype: Any = None, title: Optional[str] = None, text: Optional[str] = None, **kwargs):
+        host.messages.append({"title": title, "text": text})
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install() -> Host:
+    """
+    注册主程序替身并加载插件，重复调用时直接返回
+    """
+    if "app.plugins.crossseed" in sys.modules:
+        return host
+    schemas = _module("app.schemas", NotificationType=NotificationType, ServiceInfo=ServiceInfo, Response=Response)
+    schemas.types = _module("app.schemas.types", EventType=EventType)
+    _module("app", schemas=schemas, __path__=[])
+    _module("app.core", __path__=[])
+    _module("app.core.config", settings=settings)
+    _module("app.core.event", eventmanager=EventManager())
+    _module("app.db", __path__=[])
+    _module("app.db.site_oper", SiteOper=SiteOper)
+    _module("app.helper", __path__=[])
+    _module("app.helper.downloader", DownloaderHelper=DownloaderHelper)
+    _module("app.helper.sites", SitesHelper=SitesHelper)
+    _module("app.helper.torrent", TorrentHelper=TorrentHelper)
+    _module("app.log", logger=logger)
+    _module("app.plugins", _PluginBase=PluginBase, __path__=[])
+    _module("app.utils", __path__=[])
+    _module("app.utils.http", RequestUtils=RequestUtils)
+    _module("app.utils.string", StringUtils=StringUtils)
+    _module("app.utils.timer", TimerUtils=TimerUtils)
+
+    spec = importlib.util.spec_from_file_location("app.plugins.crossseed", PLUGIN_DIR / "__init__.py",
+                                                  submodule_search_locations=[str(PLUGIN_DIR)])
+    plugin = importlib.util.module_from_spec(spec)
+    sys.modules["app.plugins.crossseed"] = plugin
+    spec.loader.exec_module(plugin)
+    return host
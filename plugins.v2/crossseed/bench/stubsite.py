@@ -0,0 +1,173 @@
+"""
+本地站点替身，实现 api/pieces-hash、nexusapi/pieces-hash 和 download.php，可配置响应延迟和出错比例
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from corpus import SyntheticTorrent, cross_seed_copy
+
+
+class StubSite(object):
+    """
+    :param name: 站点名称
+    :param passkey: 站点passkey，请求中的passkey不一致时返回 401
+    :param latency: 每次请求的响应延迟（秒），实际延迟在 [0.5, 1.5] 倍之间随机
+    :param error_rate: 返回 500 的比例
+    :param throttle_rate: 返回限流提示的比例
+    :param status: 不为空时所有请求都返回该状态码，模拟passkey错误或站点关闭
+    """
+
+    def __init__(self, name: str, passkey: str, latency: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, status: Optional[int] = None, seed: int = 0) -> None:
+        self.name = name
+        self.passkey = passkey
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.status = status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # {pieces_hash: 种子ID}
+        self._ids: Dict[str, str] = {}
+        # {种子ID: 种子内容}
+        self._torrents: Dict[str, bytes] = {}
+        # 请求统计
+        self.requests = Counter()
+        self.downloads = Counter()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self.__handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+    @property
+    def announce(self) -> str:
+        return f"https://{self.name}.example.org/announce.php?passkey={self.passkey}"
+
+    def publish(self, torrents: Iterable[SyntheticTorrent]):
+        """
+        在站点上发布与本地种子内容相同的种子
+        """
+        for torrent in torrents:
+            torrent_id = str(len(self._torrents) + 1)
+            self._ids[torrent.pieces_hash] = torrent_id
+            self._torrents[torrent_id] = cross_seed_copy(torrent, source=self.name, announce=self.announce).data
+
+    def start(self) -> "StubSite":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests.clear()
+            self.downloads.clear()
+
+    def _fault(self) -> Optional[int]:
+        """
+        按配置的比例返回模拟的错误
+        """
+        with self._lock:
+            value = self._random.random()
+            delay = self.latency * (0.5 + self._random.random())
+        time.sleep(delay)
+        if self.status:
+            return self.status
+        if value < self.error_rate:
+            return 500
+        if value < self.error_rate + self.throttle_rate:
+            return 429
+        return None
+
+    def __handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, data: dict, status: int = 200):
+                self._reply(status, json.dumps(data).encode("utf-8"))
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if path not in ("/api/pieces-hash", "/nexusapi/pieces-hash"):
+                    self._reply(404, b"")
+                    return
+                fault = site._fault()
+                with site._lock:
+                    site.requests["query"] += 1
+                    if fault:
+                        site.requests[str(fault)] += 1
+                if fault == 429:
+                    self._json({"ret": 1, "msg": "请求过于频繁，请稍后再试"})
+                    return
+                if fault:
+                    self._reply(fault, b"error", content_type="text/plain")
+                    return
+                try:
+                    data = json.loads(body)
+                except ValueError:
+                    self._json({"ret": 1, "msg": "参数错误"})
+                    return
+                if data.get("passkey") != site.passkey:
+                    self._json({"ret": 1, "msg": "passkey错误"}, status=401)
+                    return
+                pieces_hashes = data.get("pieces_hash") or []
+                with site._lock:
+                    site.requests["hashes"] += len(pieces_hashes)
+                self._json({"ret": 0, "msg": "", "data": {pieces_hash: site._ids[pieces_hash]
+                                                          for pieces_hash in pieces_hashes
+                                                          if pieces_hash in site._ids}})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/download.php":
+                    self._reply(404, b"")
+                    return
+                query = parse_qs(url.query)
+                torrent_id = (query.get("id") or [""])[0]
+                fault = site._fault()
+                with site._lock:
+                    site.requests["download"] += 1
+                    if fault:
+                        site.requests[str(fault)] += 1
+                    else:
+                        site.downloads[torrent_id] += 1
+                if fault == 429:
+                    self._reply(200, "<html>下载过于频繁，请稍后再试</html>".encode("utf-8"), "text/html")
+                    return
+                if fault:
+                    self._reply(fault, b"error", content_type="text/plain")
+                    return
+                if (query.get("passkey") or [""])[0] != site.passkey:
+                    self._reply(403, b"")
+                    return
+                content = site._torrents.get(torrent_id)
+                if content is None:
+                    self._reply(404, b"")
+                    return
+                self._reply(200, content, "application/x-bittorrent")
+
+        return Handler
@@ -0,0 +1,78 @@
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+class RunCheckpoint(object):
+    """
+    辅种任务断点
+    记录每个站点已查询到的位置和尚未处理的可辅种结果，任务中断后下次运行从断点继续查询
+    站点查询按 pieces_hash 排序进行，断点位置为最后一个已查询的 pieces_hash
+    """
+
+    def __init__(self, data: Optional[dict], max_age_hours: float,
+                 save: Callable[[dict], None]) -> None:
+        """
+        :param data: 上次保存的断点数据
+        :param max_age_hours: 断点有效小时数，超过后丢弃断点重新开始
+        :param save: 保存断点数据的方法
+        """
+        data = data or {}
+        started_at = data.get("started_at")
+        if not started_at or time.time() - started_at > max_age_hours * 3600:
+            data = {}
+        self.resumed = bool(data)
+        self._started_at = data.get("started_at") or int(time.time())
+        self._sites: dict = data.get("sites") or {}
+        self._save = save
+        self._lock = threading.Lock()
+
+    @property
+    def started_at(self) -> int:
+        return self._started_at
+
+    def is_done(self, site: str) -> bool:
+        """
+        站点是否已完成查询和辅种
+        """
+        return bool(self._sites.get(site, {}).get("done"))
+
+    def cursor(self, site: str) -> Optional[str]:
+        """
+        站点最后一个已查询的 pieces_hash
+        """
+        return self._sites.get(site, {}).get("cursor")
+
+    def matches(self, site: str) -> List[Tuple[str, str]]:
+        """
+        站点已查询到但尚未处理的可辅种结果 [(pieces_hash, 种子ID)]
+        """
+        return [(item[0], item[1]) for item in self._sites.get(site, {}).get("matches") or []]
+
+    def update(self, site: str, cursor: str, matches: List[Tuple[str, str]]):
+        """
+        记录站点查询进度，追加本批次查询到的可辅种结果
+        """
+        with self._lock:
+            site_data = self._sites.setdefault(site, {})
+            site_data["cursor"] = cursor
+            site_data.setdefault("matches", []).extend([list(match) for match in matches])
+            self.__save()
+
+    def finish(self, site: str):
+        """
+        站点查询结果已全部处理
+        """
+        with self._lock:
+            self._sites[site] = {"done": True}
+            self.__save()
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self._started_at,
+            "updated_at": int(time.time()),
+            "sites": self._sites
+        }
+
+    def __save(self):
+        self._save(self.to_dict())
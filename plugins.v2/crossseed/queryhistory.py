@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Union
+
+from app.log import logger
+
+
+class QueryHistory(object):
+    """
+    站点辅种查询记录
+    记录每个站点查询过且没有可辅种结果的 pieces_hash 及查询时间，有效期内不再重复查询
+    """
+
+    # 批量提交的记录数
+    _commit_batch = 1000
+
+    def __init__(self, db_path: Union[Path, str], ttl_days: float) -> None:
+        """
+        :param db_path: 数据库文件路径
+        :param ttl_days: 查询记录有效天数
+        """
+        self._lock = threading.Lock()
+        self._ttl = ttl_days * 86400
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_history ("
+            "site TEXT NOT NULL, "
+            "pieces_hash TEXT NOT NULL, "
+            "queried_at INTEGER NOT NULL, "
+            "PRIMARY KEY (site, pieces_hash))"
+        )
+        self._conn.commit()
+        self._pending = 0
+
+    def _expire_seconds(self, pieces_hash: str) -> float:
+        """
+        每个 pieces_hash 的有效期在 [ttl, 1.5*ttl) 之间按hash值分散，
+        避免同一天查询过的种子同一天全部过期，使全量重新查询分摊到多天
+        """
+        try:
+            fraction = int(pieces_hash[:8], 16) / 0xFFFFFFFF
+        except ValueError:
+            fraction = 0
+        return self._ttl * (1 + fraction / 2)
+
+    def filter_pending(self, site: str, pieces_hashes: Iterable[str]) -> List[str]:
+        """
+        过滤出需要查询的 pieces_hash：从未查询过或查询记录已过期
+        """
+        with self._lock:
+            history = dict(self._conn.execute(
+                "SELECT pieces_hash, queried_at FROM query_history WHERE site = ?", (site,)
+            ).fetchall())
+        now = time.time()
+        pending = []
+        for pieces_hash in pieces_hashes:
+            queried_at = history.get(pieces_hash)
+            if queried_at is None or now - queried_at >= self._expire_seconds(pieces_hash):
+                pending.append(pieces_hash)
+        return pending
+
+    def mark(self, site: str, pieces_hashes: Iterable[str]):
+        """
+        记录没有可辅种结果的 pieces_hash
+        """
+        now = int(time.time())
+        rows = [(site, pieces_hash, now) for pieces_hash in pieces_hashes]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO query_history (site, pieces_hash, queried_at) VALUES (?, ?, ?)", rows
+            )
+            self._pending += len(rows)
+            if self._pending >= self._commit_batch:
+                self._conn.commit()
+                self._pending = 0
+
+    def clear(self, site: str):
+        """
+        清除站点的查询记录
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM query_history WHERE site = ?", (site,))
+            self._conn.commit()
+
+    def close(self):
+        """
+        清理过期记录并关闭
+        """
+        with self._lock:
+            try:
+                expire_at = int(time.time() - self._ttl * 1.5)
+                self._conn.execute("DELETE FROM query_history WHERE queried_at < ?", (expire_at,))
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"保存站点查询记录出错：{str(e)}")
+            finally:
+                self._conn.close()
@@ -0,0 +1,124 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket(object):
+    """
+    令牌桶限速器，每个站点独立使用，多个线程共享时保证整体请求速率
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, event: Optional[threading.Event] = None) -> None:
+        """
+        :param rate: 每秒补充的令牌数，小于等于0时不限速
+        :param capacity: 令牌桶容量，即允许的突发请求数
+        :param event: 退出事件，被设置后不再发放令牌
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._event = event
+
+    def acquire(self, tokens: float = 1) -> bool:
+        """
+        获取令牌，令牌不足时等待
+        :return: 是否获取成功，退出事件已被设置或在等待期间被设置时返回False
+        """
+        if self.rate <= 0:
+            return not (self._event and self._event.is_set())
+        while True:
+            if self._event and self._event.is_set():
+                return False
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if self._event:
+                if self._event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class AdaptivePacer(object):
+    """
+    站点查询自适应控制器
+    响应快且成功时逐步增大批次、缩短间隔；超时或被限流时缩小批次并指数退避
+    """
+
+    # 批次大小范围
+    min_batch = 20
+    max_batch = 500
+    # 最大请求间隔（秒）
+    max_gap = 300
+    # 响应时间低于该值视为快速响应（秒）
+    fast_seconds = 3
+    # 连续快速成功多少次后增大批次
+    grow_after = 3
+
+    def __init__(self, base_gap: float, batch_size: int = 100, gap: Optional[float] = None) -> None:
+        """
+        :param base_gap: 站点配置的最小请求间隔
+        :param batch_size: 初始批次大小
+        :param gap: 初始请求间隔，不小于 base_gap
+        """
+        self.base_gap = base_gap
+        self.batch_size = max(self.min_batch, min(self.max_batch, int(batch_size)))
+        self.gap = max(base_gap, gap or base_gap)
+        self.streak = 0
+        self.failures = 0
+        self.updated_at = None
+
+    def on_success(self, elapsed: float):
+        """
+        请求成功，响应够快时逐步增大批次并恢复请求间隔
+        """
+        self.failures = 0
+        self.updated_at = time.time()
+        if elapsed > self.fast_seconds:
+            self.streak = 0
+            return
+        self.streak += 1
+        self.gap = max(self.base_gap, self.gap * 0.8)
+        if self.streak >= self.grow_after:
+            self.streak = 0
+            self.batch_size = min(self.max_batch, int(self.batch_size * 1.25))
+
+    def on_failure(self):
+        """
+        请求超时或被限流，缩小批次并加倍请求间隔
+        """
+        self.streak = 0
+        self.failures += 1
+        self.updated_at = time.time()
+        self.batch_size = max(self.min_batch, self.batch_size // 2)
+        self.gap = min(self.max_gap, max(self.gap * 2, self.base_gap, 1))
+
+    @property
+    def rate(self) -> float:
+        """
+        对应令牌桶的每秒令牌数
+        """
+        return 1 / self.gap if self.gap else 0
+
+    def to_dict(self) -> dict:
+        return {
+            "batch_size": self.batch_size,
+            "gap": round(self.gap, 2),
+            "updated_at": self.updated_at
+        }
+
+    @staticmethod
+    def from_dict(base_gap: float, data: Optional[dict]) -> "AdaptivePacer":
+        data = data or {}
+        pacer = AdaptivePacer(base_gap=base_gap,
+                              batch_size=data.get("batch_size") or 100,
+                              gap=data.get("gap"))
+        pacer.updated_at = data.get("updated_at")
+        return pacer
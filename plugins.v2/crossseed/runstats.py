@@ -0,0 +1,126 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# 统计的辅种阶段
+STAGES = ("scan", "parse", "query", "download", "add")
+
+
+class RunStats(object):
+    """
+    辅种任务运行统计
+    记录各阶段耗时和处理数量，以及每个站点的查询数量、请求延迟和错误数
+    各阶段均可能在多线程中执行（多个下载器并发扫描解析，查询、下载、添加使用线程池），记录的是各线程累计耗时
+    """
+
+    def __init__(self, kind: str) -> None:
+        """
+        :param kind: 辅种任务类型
+        """
+        self.kind = kind
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self._counts: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self._sites: Dict[str, dict] = {}
+        # {不辅种规则: 跳过的种子数}
+        self.skips: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        统计代码块耗时
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start_time)
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    def add_count(self, name: str, count: int = 1):
+        """
+        累计阶段处理数量：扫描种子数、解析种子数、查询种子数、下载种子数、添加种子数
+        """
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + count
+
+    def __site(self, site: str) -> dict:
+        return self._sites.setdefault(site, {
+            "queried": 0,
+            "matched": 0,
+            "latencies": [],
+            "errors": 0
+        })
+
+    def add_query(self, site: str, hashes_cnt: int, latency: float, matched: Optional[int]):
+        """
+        记录一次站点查询
+        :param matched: 可辅种数，查询失败时为None
+        """
+        with self._lock:
+            site_stats = self.__site(site)
+            site_stats["latencies"].append(latency)
+            self._counts["query"] += hashes_cnt
+            if matched is None:
+                site_stats["errors"] += 1
+            else:
+                site_stats["queried"] += hashes_cnt
+                site_stats["matched"] += matched
+
+    def add_error(self, site: str):
+        """
+        记录一次站点查询以外的错误，如种子下载失败
+        """
+        with self._lock:
+            self.__site(site)["errors"] += 1
+
+    @staticmethod
+    def __percentile(values: List[float], percent: float) -> Optional[float]:
+        if not values:
+            return None
+        index = max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))
+        return round(values[index], 3)
+
+    def to_dict(self, counters: Optional[dict] = None) -> dict:
+        """
+        汇总为可保存的统计数据
+        """
+        finished_at = time.time()
+        duration = finished_at - self.started_at
+        with self._lock:
+            sites = {}
+            for site, site_stats in self._sites.items():
+                latencies = sorted(site_stats["latencies"])
+                sites[site] = {
+                    "queried": site_stats["queried"],
+                    "matched": site_stats["matched"],
+                    "requests": len(latencies),
+                    "errors": site_stats["errors"],
+                    "p50": self.__percentile(latencies, 50),
+                    "p90": self.__percentile(latencies, 90),
+                    "p99": self.__percentile(latencies, 99),
+                    "max": round(latencies[-1], 3) if latencies else None
+                }
+            return {
+                "kind": self.kind,
+                "started_at": int(self.started_at),
+                "finished_at": int(finished_at),
+                "duration": round(duration, 1),
+                "stages": {stage: round(seconds, 1) for stage, seconds in self._stages.items()},
+                "counts": dict(self._counts),
+                # 各阶段每秒处理数量，端到端吞吐按扫描种子数和总耗时计算
+                "throughput": {
+                    "total": round(self._counts["scan"] / duration, 1) if duration else None,
+                    **{stage: round(self._counts[stage] / seconds, 1) if seconds else None
+                       for stage, seconds in self._stages.items()}
+                },
+                "counters": counters or {},
+                "skips": dict(self.skips),
+                "sites": sites
+            }
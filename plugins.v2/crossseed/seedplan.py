@@ -0,0 +1,78 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class SeedPlan(object):
+    """
+    辅种计划
+    预演模式下只扫描和查询站点，不下载也不添加种子，记录每个下载器、站点的可辅种情况和待下载的种子，
+    并按当前的查询节奏估算请求数和耗时，确认后可直接按计划下载添加，无需重新查询
+    """
+
+    def __init__(self) -> None:
+        self.created_at = int(time.time())
+        self._lock = threading.Lock()
+        # {下载器: {站点: 统计和待下载种子}}
+        self._downloaders: Dict[str, Dict[str, dict]] = {}
+        # {站点: 预估数据}
+        self._sites: Dict[str, dict] = {}
+
+    def add_site_result(self, downloader: str, site: str, matched: int, local: int, cached: int,
+                        tasks: List[Tuple[str, str, Optional[str]]]):
+        """
+        记录单个下载器在单个站点的辅种结果
+        :param matched: 站点返回的可辅种数
+        :param local: 已在下载器中做种的种子数
+        :param cached: 因辅种成功或失败缓存跳过的种子数
+        :param tasks: 待下载添加的种子 [(pieces_hash, 种子ID, 保存路径)]
+        """
+        with self._lock:
+            self._downloaders.setdefault(downloader, {})[site] = {
+                "matched": matched,
+                "local": local,
+                "cached": cached,
+                "tasks": [list(task) for task in tasks]
+            }
+
+    def set_site_estimate(self, site: str, requests: int, query_seconds: float, download_rate: float):
+        """
+        记录站点的查询请求数和预估耗时
+        :param requests: 查询全部种子需要的请求数
+        :param query_seconds: 按当前请求间隔和响应时间预估的查询耗时
+        :param download_rate: 站点每秒最多下载的种子数
+        """
+        with self._lock:
+            self._sites[site] = {
+                "requests": requests,
+                "query_seconds": round(query_seconds, 1),
+                "download_rate": download_rate
+            }
+
+    def to_dict(self) -> dict:
+        """
+        汇总为可保存的计划数据，预估耗时按各站点并行、同一站点内查询和下载依次进行计算
+        """
+        with self._lock:
+            sites = {}
+            for site, estimate in self._sites.items():
+                downloads = sum(len(site_results.get(site, {}).get("tasks") or [])
+                                for site_results in self._downloaders.values())
+                download_rate = estimate.get("download_rate")
+                download_seconds = downloads / download_rate if download_rate else 0
+                sites[site] = {
+                    "requests": estimate.get("requests"),
+                    "query_seconds": estimate.get("query_seconds"),
+                    "downloads": downloads,
+                    "download_seconds": round(download_seconds, 1)
+                }
+            return {
+                "created_at": self.created_at,
+                "downloaders": self._downloaders,
+                "sites": sites,
+                "requests": sum(site.get("requests") or 0 for site in sites.values()),
+                "downloads": sum(site.get("downloads") for site in sites.values()),
+                "full_seconds": max([site.get("query_seconds") + site.get("download_seconds")
+                                     for site in sites.values()] or [0]),
+                "execute_seconds": max([site.get("download_seconds") for site in sites.values()] or [0])
+            }
@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from app.log import logger
+
+# 缓存键：(下载器, 站点, 种子ID)
+CacheKey = Tuple[str, str, str]
+
+
+class SeedStore(object):
+    """
+    辅种结果缓存
+    以 (下载器, 站点, 种子ID) 为主键记录辅种状态（success/fail/error），按主键索引查询，
+    运行中的写入先缓存在内存中批量提交，关闭时清理过期和超过保留天数的记录
+    """
+
+    SUCCESS = "success"
+    FAIL = "fail"
+    ERROR = "error"
+
+    # 批量提交的记录数
+    _commit_batch = 500
+
+    def __init__(self, db_path: Union[Path, str], retention_days: float = 180) -> None:
+        """
+        :param db_path: 数据库文件路径
+        :param retention_days: 记录保留天数，超过后清理
+        """
+        self._lock = threading.Lock()
+        self._retention = retention_days * 86400
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seed_cache ("
+            "downloader TEXT NOT NULL, "
+            "site TEXT NOT NULL, "
+            "torrent_id TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "updated_at INTEGER NOT NULL, "
+            "expire_at INTEGER, "
+            "PRIMARY KEY (downloader, site, torrent_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_seed_cache_updated_at ON seed_cache (updated_at)")
+        self._conn.commit()
+        # 待提交的记录 {缓存键: (状态, 更新时间, 过期时间)}
+        self._pending: Dict[CacheKey, Tuple[str, int, Optional[int]]] = {}
+
+    @staticmethod
+    def key(downloader: str, site: str, torrent_id) -> CacheKey:
+        return downloader, site, str(torrent_id)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """
+        查询辅种状态，记录不存在或已过期时返回None
+        """
+        with self._lock:
+            row = self._pending.get(key)
+            if not row:
+                row = self._conn.execute(
+                    "SELECT status, updated_at, expire_at FROM seed_cache "
+                    "WHERE downloader = ? AND site = ? AND torrent_id = ?", key
+                ).fetchone()
+        if not row:
+            return None
+        status, _, expire_at = row
+        if expire_at and expire_at <= time.time():
+            return None
+        return status
+
+    def add(self, key: CacheKey, status: str, ttl: Optional[float] = None):
+        """
+        记录辅种状态，已存在时覆盖
+        :param ttl: 有效期（秒），为空时只受保留天数限制
+        """
+        now = int(time.time())
+        with self._lock:
+            self._pending[key] = (status, now, int(now + ttl) if ttl else None)
+            if len(self._pending) >= self._commit_batch:
+                self.__flush()
+
+    def import_rows(self, rows: Iterable[tuple]):
+        """
+        导入 (下载器, 站点, 种子ID, 状态, 过期时间) 记录，用于从旧版本插件数据迁移，已存在的记录不覆盖
+        """
+        now = int(time.time())
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seed_cache "
+                "(downloader, site, torrent_id, status, updated_at, expire_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(downloader, site, str(torrent_id), status, now, expire_at)
+                 for downloader, site, torrent_id, status, expire_at in rows]
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._pending = {}
+            self._conn.execute("DELETE FROM seed_cache")
+            self._conn.commit()
+
+    def __flush(self):
+        if not self._pending:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO seed_cache "
+            "(downloader, site, torrent_id, status, updated_at, expire_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [key + row for key, row in self._pending.items()]
+        )
+        self._conn.commit()
+        self._pending = {}
+
+    def close(self):
+        """
+        提交待写入记录，清理过期记录并关闭
+        """
+        with self._lock:
+            try:
+                self.__flush()
+                now = int(time.time())
+                cursor = self._conn.execute(
+                    "DELETE FROM seed_cache WHERE expire_at <= ? OR updated_at < ?",
+                    (now, int(now - self._retention))
+                )
+                if cursor.rowcount:
+                    logger.info(f"清理过期辅种缓存记录 {cursor.rowcount} 条")
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"保存辅种缓存出错：{str(e)}")
+            finally:
+                self._conn.close()
@@ -0,0 +1,62 @@
+import re
+from typing import Callable, Dict, Iterable, Optional
+
+from app.utils.string import StringUtils
+
+
+class TrackerSiteResolver(object):
+    """
+    tracker地址到站点名称的解析器，每次辅种任务构建一次
+    优先按passkey匹配辅种站点，其次按tracker域名匹配站点索引，解析结果按tracker地址缓存
+    """
+
+    # tracker地址中可能是passkey的片段
+    _token_pattern = re.compile(r"[0-9A-Za-z]+")
+
+    def __init__(self, site_passkeys: Dict[str, str],
+                 indexer_lookup: Callable[[str], Optional[dict]]) -> None:
+        """
+        :param site_passkeys: {passkey: 站点名称}
+        :param indexer_lookup: 按域名查询站点索引的方法
+        """
+        self._passkey_sites = {passkey: name for passkey, name in site_passkeys.items() if passkey}
+        # 所有passkey合并为一个正则，passkey不是完整片段时一次扫描完成子串匹配
+        self._passkey_regex = re.compile("|".join(
+            re.escape(passkey) for passkey in sorted(self._passkey_sites, key=len, reverse=True)
+        )) if self._passkey_sites else None
+        self._indexer_lookup = indexer_lookup
+        self._domain_sites: Dict[str, Optional[str]] = {}
+        self._tracker_sites: Dict[str, Optional[str]] = {}
+
+    def __match_passkey(self, tracker: str) -> Optional[str]:
+        if not self._passkey_regex:
+            return None
+        for token in self._token_pattern.findall(tracker):
+            site_name = self._passkey_sites.get(token)
+            if site_name:
+                return site_name
+        match = self._passkey_regex.search(tracker)
+        return self._passkey_sites.get(match.group(0)) if match else None
+
+    def __match_domain(self, tracker: str) -> Optional[str]:
+        domain = StringUtils.get_url_domain(tracker)
+        if domain not in self._domain_sites:
+            site_info = self._indexer_lookup(domain)
+            self._domain_sites[domain] = site_info.get("name") if site_info else None
+        return self._domain_sites[domain]
+
+    def resolve(self, trackers: Iterable[str]) -> Optional[str]:
+        """
+        根据种子的tracker地址获取站点名称，优先使用passkey匹配的结果
+        """
+        trackers = list(trackers)
+        for tracker in trackers:
+            if tracker not in self._tracker_sites:
+                self._tracker_sites[tracker] = self.__match_passkey(tracker)
+            if self._tracker_sites[tracker]:
+                return self._tracker_sites[tracker]
+        for tracker in trackers:
+            site_name = self.__match_domain(tracker)
+            if site_name:
+                return site_name
+        return None
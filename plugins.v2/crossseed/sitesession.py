@@ -0,0 +1,93 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from app.log import logger
+from app.utils.http import RequestUtils
+
+
+class SiteSessions(object):
+    """
+    站点长连接会话池
+    每个站点在一次辅种任务中复用同一个会话，Cookie、UA和代理只绑定一次，避免每次请求重新建立TCP和TLS连接
+    """
+
+    def __init__(self, pool_size: int = 4) -> None:
+        """
+        :param pool_size: 每个站点的连接池大小，应不小于同时使用会话的线程数（站点查询线程和所有种子下载线程）
+        """
+        self._pool_size = max(1, pool_size)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Session] = {}
+
+    def get(self, name: str, cookie: Optional[str] = None, ua: Optional[str] = None,
+            proxies: Optional[dict] = None) -> Session:
+        """
+        获取站点会话，不存在时创建
+        """
+        with self._lock:
+            session = self._sessions.get(name)
+            if session:
+                return session
+            session = Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if ua:
+                session.headers["User-Agent"] = ua
+            if cookie:
+                session.cookies.update(RequestUtils.cookie_parse(cookie))
+            if proxies:
+                session.proxies.update(proxies)
+            self._sessions[name] = session
+            return session
+
+    @staticmethod
+    def connection_stats(session: Session) -> Tuple[int, int]:
+        """
+        统计会话的请求数和新建连接数
+        :return: (请求数, 新建连接数)
+        """
+        requests_cnt = 0
+        connections_cnt = 0
+        for adapter in set(session.adapters.values()):
+            managers = [adapter.poolmanager] + list(getattr(adapter, "proxy_manager", {}).values())
+            for manager in managers:
+                if not manager:
+                    continue
+                for key in list(manager.pools.keys()):
+                    pool = manager.pools.get(key)
+                    if not pool:
+                        continue
+                    requests_cnt += pool.num_requests
+                    connections_cnt += pool.num_connections
+        return requests_cnt, connections_cnt
+
+    def log_stats(self, name: str):
+        """
+        输出站点连接复用情况
+        """
+        session = self._sessions.get(name)
+        if not session:
+            return
+        try:
+            requests_cnt, connections_cnt = self.connection_stats(session)
+            logger.debug(f"站点{name}连接复用情况：请求{requests_cnt}次，新建连接{connections_cnt}次，"
+                         f"复用{max(0, requests_cnt - connections_cnt)}次")
+        except Exception as e:
+            logger.debug(f"统计站点{name}连接复用情况失败：{str(e)}")
+
+    def close(self):
+        """
+        关闭所有会话
+        """
+        with self._lock:
+            for name, session in self._sessions.items():
+                self.log_stats(name)
+                try:
+                    session.close()
+                except Exception as e:
+                    logger.debug(f"关闭站点{name}会话失败：{str(e)}")
+            self._sessions = {}
@@ -0,0 +1,73 @@
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+class SkipRules(object):
+    """
+    不辅种的路径和标签规则，每次辅种任务编译一次
+    路径规则按目录层级构建前缀树，只匹配完整的目录层级（/data/a 不会匹配 /data/ab），
+    每个保存路径的匹配结果缓存，标签规则使用集合匹配，并统计每条规则跳过的种子数
+    """
+
+    _sep_pattern = re.compile(r"[\\/]+")
+    # 前缀树节点中标记规则结束的键
+    _end = ""
+
+    def __init__(self, nopaths: Iterable[str], nolabels: Iterable[str]) -> None:
+        self._trie: dict = {}
+        for nopath in nopaths:
+            nopath = nopath.strip()
+            if not nopath:
+                continue
+            node = self._trie
+            for part in self.__split(nopath):
+                node = node.setdefault(part, {})
+            node.setdefault(self._end, nopath)
+        self._labels = {label.strip() for label in nolabels if label and label.strip()}
+        self._path_cache: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        # {规则: 跳过的种子数}
+        self.counts: Dict[str, int] = {}
+
+    def __split(self, path: str) -> List[str]:
+        return [part for part in self._sep_pattern.split(os.path.normpath(path)) if part and part != "."]
+
+    def match_path(self, save_path: Optional[str]) -> Optional[str]:
+        """
+        匹配保存路径，返回命中的路径规则
+        """
+        if not self._trie or not save_path:
+            return None
+        if save_path in self._path_cache:
+            return self._path_cache[save_path]
+        node = self._trie
+        rule = node.get(self._end)
+        for part in self.__split(save_path):
+            if rule:
+                break
+            node = node.get(part)
+            if node is None:
+                break
+            rule = node.get(self._end)
+        self._path_cache[save_path] = rule
+        return rule
+
+    def match_labels(self, labels: Optional[Iterable[str]]) -> Optional[str]:
+        """
+        匹配种子标签，返回命中的标签规则
+        """
+        if not self._labels or not labels:
+            return None
+        for label in labels:
+            if label in self._labels:
+                return label
+        return None
+
+    def skip(self, rule: str):
+        """
+        记录规则跳过一个种子
+        """
+        with self._lock:
+            self.counts[rule] = self.counts.get(rule, 0) + 1
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from app.log import logger
+
+
+class TorrentCache(object):
+    """
+    站点种子文件本地缓存
+    以 站点:种子ID 为键保存下载过的种子文件，辅种失败后重试时直接使用缓存，不再从站点重复下载
+    超过总大小时按最近使用时间淘汰，超过有效期的缓存不再使用
+    文件名为 键的md5_下载时间.torrent，文件修改时间为最近使用时间
+    """
+
+    def __init__(self, cache_dir: Union[Path, str], max_bytes: int, ttl_days: float) -> None:
+        """
+        :param cache_dir: 缓存目录
+        :param max_bytes: 缓存总大小上限
+        :param ttl_days: 缓存有效天数，从下载时间开始计算
+        """
+        self._dir = Path(cache_dir)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._ttl = ttl_days * 86400
+        self._lock = threading.Lock()
+        # {键的md5: (文件路径, 文件大小, 下载时间)}，按最近使用时间排序
+        self._items: "OrderedDict[str, Tuple[Path, int, int]]" = OrderedDict()
+        self._size = 0
+        self.__load()
+
+    def __load(self):
+        entries = []
+        now = time.time()
+        for entry in os.scandir(self._dir):
+            if not entry.is_file() or not entry.name.endswith(".torrent"):
+                continue
+            try:
+                name, saved_at = entry.name[:-len(".torrent")].split("_", 1)
+                saved_at = int(saved_at)
+                stat = entry.stat()
+            except (ValueError, OSError):
+                self.__remove(Path(entry.path))
+                continue
+            if now - saved_at > self._ttl:
+                self.__remove(Path(entry.path))
+                continue
+            entries.append((stat.st_mtime, name, Path(entry.path), stat.st_size, saved_at))
+        for _, name, path, size, saved_at in sorted(entries):
+            self._items[name] = (path, size, saved_at)
+            self._size += size
+        self.__evict()
+
+    @staticmethod
+    def __key(site: str, torrent_id: str) -> str:
+        return hashlib.md5(f"{site}:{torrent_id}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def __remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def __evict(self):
+        while self._size > self._max_bytes and self._items:
+            _, (path, size, _) = self._items.popitem(last=False)
+            self._size -= size
+            self.__remove(path)
+
+    def get(self, site: str, torrent_id: str) -> Optional[bytes]:
+        """
+        获取缓存的种子文件内容，不存在或已过期时返回None
+        """
+        name = self.__key(site, torrent_id)
+        with self._lock:
+            item = self._items.get(name)
+            if not item:
+                return None
+            path, size, saved_at = item
+            if time.time() - saved_at > self._ttl:
+                del self._items[name]
+                self._size -= size
+                self.__remove(path)
+                return None
+            try:
+                content = path.read_bytes()
+                os.utime(path)
+            except OSError as e:
+                logger.debug(f"读取种子缓存 {path} 失败：{str(e)}")
+                del self._items[name]
+                self._size -= size
+                return None
+            self._items.move_to_end(name)
+            return content
+
+    def put(self, site: str, torrent_id: str, content: bytes):
+        """
+        缓存种子文件内容
+        """
+        name = self.__key(site, torrent_id)
+        saved_at = int(time.time())
+        path = self._dir / f"{name}_{saved_at}.torrent"
+        with self._lock:
+            old = self._items.pop(name, None)
+            if old:
+                self._size -= old[1]
+                self.__remove(old[0])
+            try:
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(content)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.debug(f"保存种子缓存 {path} 失败：{str(e)}")
+                return
+            self._items[name] = (path, len(content), saved_at)
+            self._size += len(content)
+            self.__evict()
@@ -0,0 +1,155 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from app.log import logger
+
+
+class TorrentIndex(object):
+    """
+    本地种子元数据索引
+    以 种子路径+文件大小+修改时间 为键缓存 info_hash、pieces_hash、announce，
+    未变化的种子文件直接从索引中读取，只有新增或变化的种子文件才需要重新解析
+    没有种子文件、需要从下载器导出的种子以 下载器+种子hash 为键缓存，每个种子只导出一次
+    """
+
+    # 超过该天数未被扫描到的索引记录会被清理
+    _expire_days = 30
+    # 批量提交的记录数
+    _commit_batch = 500
+
+    def __init__(self, db_path: Union[Path, str]) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS torrent_index ("
+            "path TEXT PRIMARY KEY, "
+            "size INTEGER NOT NULL, "
+            "mtime INTEGER NOT NULL, "
+            "info_hash TEXT NOT NULL, "
+            "pieces_hash TEXT NOT NULL, "
+            "announce TEXT, "
+            "seen_at INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS export_index ("
+            "downloader TEXT NOT NULL, "
+            "hash TEXT NOT NULL, "
+            "info_hash TEXT NOT NULL, "
+            "pieces_hash TEXT NOT NULL, "
+            "announce TEXT, "
+            "seen_at INTEGER NOT NULL, "
+            "PRIMARY KEY (downloader, hash))"
+        )
+        self._conn.commit()
+        self._now = int(time.time())
+        self._seen = []
+        self._export_seen = []
+        self._pending = 0
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.parse_time = 0.0
+
+    def get(self, path: str, size: int, mtime: int) -> Optional[Tuple[str, str, Optional[str]]]:
+        """
+        查询索引，文件大小和修改时间都一致时返回 (info_hash, pieces_hash, announce)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime, info_hash, pieces_hash, announce FROM torrent_index WHERE path = ?",
+                (path,)
+            ).fetchone()
+            if row and row[0] == size and row[1] == mtime:
+                self.hits += 1
+                self._seen.append((self._now, path))
+                return row[2], row[3], row[4]
+            self.misses += 1
+            return None
+
+    def put(self, path: str, size: int, mtime: int,
+            info_hash: str, pieces_hash: str, announce: Optional[str] = None):
+        """
+        写入或更新索引记录
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO torrent_index "
+                "(path, size, mtime, info_hash, pieces_hash, announce, seen_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, size, mtime, info_hash, pieces_hash, announce, self._now)
+            )
+            self._pending += 1
+            if self._pending >= self._commit_batch:
+                self._conn.commit()
+                self._pending = 0
+
+    def get_export(self, downloader: str, torrent_hash: str) -> Optional[Tuple[str, str, Optional[str]]]:
+        """
+        查询下载器导出种子的索引，返回 (info_hash, pieces_hash, announce)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info_hash, pieces_hash, announce FROM export_index WHERE downloader = ? AND hash = ?",
+                (downloader, torrent_hash)
+            ).fetchone()
+            if row:
+                self.hits += 1
+                self._export_seen.append((self._now, downloader, torrent_hash))
+                return row[0], row[1], row[2]
+            self.misses += 1
+            return None
+
+    def put_export(self, downloader: str, torrent_hash: str,
+                   info_hash: str, pieces_hash: str, announce: Optional[str] = None):
+        """
+        写入下载器导出种子的索引
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO export_index "
+                "(downloader, hash, info_hash, pieces_hash, announce, seen_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (downloader, torrent_hash, info_hash, pieces_hash, announce, self._now)
+            )
+            self._pending += 1
+            if self._pending >= self._commit_batch:
+                self._conn.commit()
+                self._pending = 0
+
+    def add_parse_time(self, seconds: float):
+        """
+        累计未命中索引时解析种子文件的耗时
+        """
+        with self._lock:
+            self.parse_time += seconds
+
+    def stats(self) -> str:
+        """
+        索引统计信息
+        """
+        return f"命中 {self.hits}，未命中 {self.misses}，解析耗时 {self.parse_time:.2f} 秒"
+
+    def close(self):
+        """
+        刷新最近扫描时间，清理长期未扫描到的记录并关闭索引
+        """
+        with self._lock:
+            try:
+                if self._seen:
+                    self._conn.executemany("UPDATE torrent_index SET seen_at = ? WHERE path = ?", self._seen)
+                    self._seen = []
+                if self._export_seen:
+                    self._conn.executemany("UPDATE export_index SET seen_at = ? WHERE downloader = ? AND hash = ?",
+                                           self._export_seen)
+                    self._export_seen = []
+                expire_at = self._now - self._expire_days * 86400
+                removed = self._conn.execute("DELETE FROM torrent_index WHERE seen_at < ?", (expire_at,)).rowcount
+                removed += self._conn.execute("DELETE FROM export_index WHERE seen_at < ?", (expire_at,)).rowcount
+                if removed:
+                    logger.info(f"清理过期种子索引记录 {removed} 条")
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"保存种子索引出错：{str(e)}")
+            finally:
+                self._conn.close()
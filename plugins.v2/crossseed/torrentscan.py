@@ -0,0 +1,164 @@
+import hashlib
+import mmap
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+from bencode import bdecode, bencode
+
+# 支持按下标读取和 find 查找的缓冲区
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+
+def _find(buf: Buffer, sub: bytes, pos: int) -> int:
+    idx = buf.find(sub, pos)
+    if idx < 0:
+        raise ValueError(f"bencode 数据不完整，位置 {pos}")
+    return idx
+
+
+def _string_span(buf: Buffer, pos: int) -> Tuple[int, int]:
+    """
+    返回字符串内容在缓冲区中的起止位置
+    """
+    colon = _find(buf, b":", pos)
+    start = colon + 1
+    end = start + int(buf[pos:colon])
+    if end > len(buf):
+        raise ValueError(f"bencode 字符串越界，位置 {pos}")
+    return start, end
+
+
+def _skip_value(buf: Buffer, pos: int) -> int:
+    """
+    跳过一个完整的 bencode 值，返回其结束位置（不递归，避免深层嵌套时栈溢出）
+    """
+    depth = 0
+    while True:
+        c = buf[pos]
+        if c == 0x64 or c == 0x6c:  # d / l
+            depth += 1
+            pos += 1
+        elif c == 0x65:  # e
+            depth -= 1
+            if depth < 0:
+                raise ValueError(f"bencode 结构错误，位置 {pos}")
+            pos += 1
+        elif c == 0x69:  # i
+            pos = _find(buf, b"e", pos) + 1
+        elif 0x30 <= c <= 0x39:
+            _, pos = _string_span(buf, pos)
+        else:
+            raise ValueError(f"bencode 非法字符，位置 {pos}")
+        if depth == 0:
+            return pos
+
+
+def _dict_items(buf: Buffer, pos: int) -> Iterator[Tuple[bytes, int, int]]:
+    """
+    遍历字典，逐个返回 (键, 值起始位置, 值结束位置)
+    """
+    if buf[pos] != 0x64:
+        raise ValueError(f"bencode 字典格式错误，位置 {pos}")
+    pos += 1
+    while buf[pos] != 0x65:
+        key_start, key_end = _string_span(buf, pos)
+        value_end = _skip_value(buf, key_end)
+        yield buf[key_start:key_end], key_end, value_end
+        pos = value_end
+
+
+def scan_torrent(buf: Buffer) -> Tuple[Tuple[int, int], Tuple[int, int], Optional[bytes]]:
+    """
+    在原始种子数据中定位 info 字典和 pieces 字符串的字节区间，不解码整个种子
+    :return: (info区间, pieces区间, announce)
+    """
+    info_span = None
+    pieces_span = None
+    announce = None
+    for key, start, end in _dict_items(buf, 0):
+        if key == b"info":
+            info_span = (start, end)
+            for info_key, info_start, _ in _dict_items(buf, start):
+                if info_key == b"pieces":
+                    pieces_span = _string_span(buf, info_start)
+                    break
+        elif key == b"announce":
+            announce_start, announce_end = _string_span(buf, start)
+            announce = bytes(buf[announce_start:announce_end])
+    if not info_span:
+        raise ValueError("种子缺少 info 字段")
+    if not pieces_span:
+        raise ValueError("种子缺少 pieces 字段")
+    return info_span, pieces_span, announce
+
+
+def hash_torrent(buf: Buffer) -> Tuple[str, str, Optional[str]]:
+    """
+    直接对原始数据中的 info 和 pieces 区间计算 sha1，返回 (info_hash, pieces_hash, announce)
+    """
+    info_span, pieces_span, announce = scan_torrent(buf)
+    with memoryview(buf) as view:
+        info_hash = hashlib.sha1(view[info_span[0]:info_span[1]]).hexdigest()
+        pieces_hash = hashlib.sha1(view[pieces_span[0]:pieces_span[1]]).hexdigest()
+    return info_hash, pieces_hash, announce.decode("utf-8", "replace") if announce is not None else None
+
+
+def hash_torrent_file(torrent_path: Union[Path, str]) -> Tuple[str, str, Optional[str]]:
+    """
+    通过 mmap 读取种子文件并计算 hash，避免整个文件复制到内存
+    """
+    with open(torrent_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hash_torrent(mm)
+
+
+def hash_torrent_decoded(data: bytes) -> Tuple[str, str, Optional[str]]:
+    """
+    完整解码种子后计算 hash，用于格式不规范的种子
+    """
+    torrent = bdecode(data)
+    info = torrent["info"]
+    pieces = info["pieces"]
+    info_hash = hashlib.sha1(bencode(info)).hexdigest()
+    pieces_hash = hashlib.sha1(pieces).hexdigest()
+    # 从种子中获取 announce, qb可能存在获取不到的情况，会存在于fastresume文件中
+    announce = torrent.get("announce")
+    if isinstance(announce, bytes):
+        announce = announce.decode("utf-8", "replace")
+    return info_hash, pieces_hash, announce
+
+
+def parse_torrent_data(data: bytes) -> Tuple[Optional[Tuple[str, str, Optional[str]]], str]:
+    """
+    解析种子数据，返回 ((info_hash, pieces_hash, announce), 错误信息)
+    """
+    try:
+        return hash_torrent(data), ""
+    except Exception:
+        pass
+    try:
+        return hash_torrent_decoded(data), ""
+    except Exception as err:
+        return None, str(err)
+
+
+def parse_torrent_file(torrent_path: Union[Path, str]) -> Tuple[Optional[Tuple[str, str, Optional[str]]], str]:
+    """
+    解析种子文件，返回 ((info_hash, pieces_hash, announce), 错误信息)
+    """
+    try:
+        return hash_torrent_file(torrent_path), ""
+    except Exception:
+        pass
+    try:
+        with open(torrent_path, "rb") as f:
+            return hash_torrent_decoded(f.read()), ""
+    except Exception as err:
+        return None, str(err)
+
+
+def parse_torrent_files(torrent_paths: List[str]) -> List[Tuple[Optional[Tuple[str, str, Optional[str]]], str]]:
+    """
+    批量解析种子文件，供进程池按批次调用，结果顺序与输入一致
+    """
+    return [parse_torrent_file(torrent_path) for torrent_path in torrent_paths]